@@ -1 +1 @@
-from .db import engine, SessionLocal, init_db, get_session
\ No newline at end of file
+from .db import engine, SessionLocal, init_db, get_session, get_session_factory, schema_has
@@ -1,16 +1,23 @@
-from sqlmodel import SQLModel, create_engine, text
-from sqlalchemy.ext.asyncio import AsyncEngine
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import SQLModel, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.pool import NullPool
 from config import config
-from sqlalchemy.orm import sessionmaker
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Dict, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
-engine = AsyncEngine(create_engine(
-    url=config.DATABASE_URL,
+
+def _asyncpg_url(url: str) -> str:
+    """Force the asyncpg driver even if DATABASE_URL names a sync one (postgresql://, +psycopg2)."""
+    scheme, sep, rest = url.partition("://")
+    if sep and scheme.split("+")[0] in ("postgres", "postgresql") and scheme != "postgresql+asyncpg":
+        return f"postgresql+asyncpg://{rest}"
+    return url
+
+
+engine = create_async_engine(
+    _asyncpg_url(config.DATABASE_URL),
     echo=False,  # Disable echo to reduce log spam
     pool_size=100,  # Keep 100 persistent connections in pool
     max_overflow=40,  # Allow up to 15 additional overflow connections
@@ -22,13 +29,20 @@ engine = AsyncEngine(create_engine(
     connect_args={
         "server_settings": {
             "application_name": "fastapi_gis_app",
+            # Short OLTP/PostGIS queries; JIT compilation only adds planning latency here.
+            "jit": "off",
         },
         "timeout": 10,  
         "command_timeout": 60, 
+        # Per-connection prepared statement caches (asyncpg's and SQLAlchemy's adapter), so the
+        # fixed text() queries on the analysis path are parsed/planned once per connection.
+        "statement_cache_size": 1024,
+        "prepared_statement_cache_size": 1024,
     },
-))
-
+)
 
+# create_all only creates missing tables; indexes, derived columns and views on the
+# bulk-loaded tables (parcels etc.) are one-off migrations in db/migrations.py (migrate_db.py).
 async def init_db():
     """Import database."""
     try:
@@ -41,11 +55,35 @@ async def init_db():
     except Exception as e:
         logger.error(f"Error initializing database: {str(e)}", exc_info=True)
         raise
+
+# Objects added by migrate_db.py, probed once per process so queries can fall back to the base
+# tables until the migration has run. Restart the app after migrating to pick them up.
+_schema_probes: Dict[Tuple[str, Optional[str]], bool] = {}
+
+
+async def schema_has(session: AsyncSession, relation: str, column: Optional[str] = None) -> bool:
+    """Whether a table/view (or one of its columns) exists; cached for the life of the process."""
+    key = (relation, column)
+    if key not in _schema_probes:
+        if column is None:
+            result = await session.execute(text("SELECT to_regclass(:relation) IS NOT NULL"), {"relation": relation})
+        else:
+            result = await session.execute(
+                text("""
+                    SELECT EXISTS (
+                        SELECT 1 FROM information_schema.columns
+                        WHERE table_schema = current_schema() AND table_name = :relation AND column_name = :column
+                    )
+                """),
+                {"relation": relation, "column": column},
+            )
+        _schema_probes[key] = bool(result.scalar())
+    return _schema_probes[key]
+
+
 async def get_session() -> AsyncSession: 
     logger.debug("Creating new database session")
-    Session = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
-
-    async with Session() as session:
+    async with SessionLocal() as session:
         try:
             yield session
         except Exception as e:
@@ -54,13 +92,18 @@ async def get_session() -> AsyncSession:
         finally:
             logger.debug("Closing database session")
 
-SessionLocal = sessionmaker(
+SessionLocal = async_sessionmaker(
     bind=engine,
     class_=AsyncSession,
     expire_on_commit=False
 )
 
 
+def get_session_factory() -> async_sessionmaker:
+    """For routes that open several sessions of their own (e.g. concurrent analyses)."""
+    return SessionLocal
+
+
 async def dispose_engine():
     """Dispose of the database engine and close all connections."""
     logger.info("Disposing database engine and closing connections...")
@@ -0,0 +1,145 @@
+"""
+One-off DDL for the bulk-loaded tables (parcels and the spatial layers).
+
+None of this runs at startup: some statements rewrite or lock large tables, some need rights
+the app role may not have, and every worker would race to apply them. Run them once per
+database with migrate_db.py during a quiet window. Statements are idempotent and run in
+autocommit mode, so CREATE INDEX CONCURRENTLY is allowed. A failed concurrent build leaves an
+INVALID index that IF NOT EXISTS then skips; drop it and re-run.
+"""
+
+import logging
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import NullPool
+from sqlmodel import text
+
+from config import config
+from .db import _asyncpg_url
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS: Dict[str, List[str]] = {
+    # Serves ParcelSearch.get_by_owner_name: lower(owner_name) LIKE '%...%'.
+    # CREATE EXTENSION needs superuser or database-owner rights.
+    "parcels_owner_name_trgm": [
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS parcels_owner_name_trgm_idx ON parcels USING gin (lower(owner_name) gin_trgm_ops)",
+    ],
+    # Serves county filters: lower(county) = :county (normalized in Python)
+    "parcels_county_lower": [
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS parcels_county_lower_idx ON parcels (lower(county))",
+    ],
+    # Point-in-polygon lookups (get_by_coordinates, get_gid_by_coordinates); smaller and faster than GiST for PIP.
+    "parcels_geom_spgist": [
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS parcels_geom_spgist_idx ON parcels USING spgist (geom)",
+    ],
+    # Deterministic functions of geom read by every analysis; stored so the hot path is a column read.
+    # Rewrites parcels under an ACCESS EXCLUSIVE lock. Until applied, the analysis computes them from geom.
+    "parcels_derived_columns": [
+        "ALTER TABLE parcels ADD COLUMN IF NOT EXISTS centroid geometry(Point, 4326) GENERATED ALWAYS AS (ST_Centroid(geom)) STORED",
+        "ALTER TABLE parcels ADD COLUMN IF NOT EXISTS geom_simplified geometry GENERATED ALWAYS AS (ST_SimplifyPreserveTopology(geom, 0.00001)) STORED",
+        "ALTER TABLE parcels ADD COLUMN IF NOT EXISTS acreage_computed numeric GENERATED ALWAYS AS (ROUND((ST_Area(ST_Transform(geom, 3083)) / 4046.86)::numeric, 2)) STORED",
+    ],
+    # Parcel -> city is static, so it is stored instead of spatially joined on every analysis.
+    # Existing rows are filled by backfill_parcel_city_names; migrate_db.py runs it right after this.
+    "parcels_city_name": [
+        "ALTER TABLE parcels ADD COLUMN IF NOT EXISTS city_name TEXT",
+        """
+        CREATE OR REPLACE FUNCTION parcels_set_city_name() RETURNS trigger AS $$
+        BEGIN
+            NEW.city_name := COALESCE(
+                (SELECT c."CITY_NM" FROM texas_cities c WHERE ST_Within(NEW.geom, c.geometry) LIMIT 1),
+                'Outside'
+            );
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        "DROP TRIGGER IF EXISTS parcels_city_name_trg ON parcels",
+        "CREATE TRIGGER parcels_city_name_trg BEFORE INSERT OR UPDATE OF geom ON parcels FOR EACH ROW EXECUTE FUNCTION parcels_set_city_name()",
+        # Keeps the backfill's "WHERE city_name IS NULL" probe cheap once every row is filled.
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS parcels_city_name_null_idx ON parcels (gid) WHERE city_name IS NULL",
+    ],
+    # Every water analysis is an ST_Intersects / KNN probe against these layers. For best spatial
+    # locality, run "CLUSTER <table> USING <table>_geom_gix; ANALYZE <table>;" once after a reload.
+    "water_layer_indexes": [
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS wetlands_geom_gix ON wetlands USING gist (geom)",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS radcorp_water_geom_gix ON radcorp_water USING gist (geom)",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS stream_geom_gix ON stream USING gist (geom)",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS tx_fld_haz_geom_gix ON tx_fld_haz USING gist (geom)",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS tx_water_bodies_geom_gix ON tx_water_bodies USING gist (geom)",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS texas_sea_ocean_project_geom_gix ON texas_sea_ocean_project USING gist (geom)",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS water_wells_geom_gix ON water_wells USING gist (geom)",
+    ],
+    # NWI wetland multipolygons are huge; subdivided pieces have tight bboxes, so the index filters
+    # far more and each ST_Intersection is cheap. Areas summed per type are unchanged.
+    # It is a snapshot: run "python migrate_db.py --refresh-wetlands" after reloading wetlands.
+    # Until it exists, the wetland analysis reads wetlands directly.
+    "wetlands_subdiv": [
+        "CREATE MATERIALIZED VIEW IF NOT EXISTS wetlands_subdiv AS SELECT wetland_type, ST_Subdivide(geom, 256) AS geom FROM wetlands",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS wetlands_subdiv_geom_gix ON wetlands_subdiv USING gist (geom)",
+    ],
+}
+
+
+def migration_engine() -> AsyncEngine:
+    """Autocommit engine without the app's statement timeouts; index builds and rewrites run long."""
+    return create_async_engine(
+        _asyncpg_url(config.DATABASE_URL),
+        poolclass=NullPool,
+        isolation_level="AUTOCOMMIT",
+        connect_args={
+            "server_settings": {"application_name": "migrate_db", "statement_timeout": "0"},
+            "command_timeout": None,
+        },
+    )
+
+
+async def apply_migrations(engine: AsyncEngine, names: Optional[Iterable[str]] = None) -> None:
+    """Applies the named migrations (all of them by default) in MIGRATIONS order."""
+    selected = list(MIGRATIONS) if names is None else list(names)
+    unknown = [name for name in selected if name not in MIGRATIONS]
+    if unknown:
+        raise ValueError(f"Unknown migrations: {', '.join(unknown)}")
+    async with engine.connect() as conn:
+        for name in MIGRATIONS:
+            if name not in selected:
+                continue
+            logger.info(f"Applying {name}...")
+            for ddl in MIGRATIONS[name]:
+                await conn.execute(text(ddl))
+            logger.info(f"Applied {name}")
+
+
+async def refresh_wetlands_subdiv(engine: AsyncEngine) -> None:
+    """Rebuilds wetlands_subdiv from wetlands. Blocks readers of the view while it runs."""
+    async with engine.connect() as conn:
+        await conn.execute(text("REFRESH MATERIALIZED VIEW wetlands_subdiv"))
+        await conn.execute(text("ANALYZE wetlands_subdiv"))
+    logger.info("Refreshed wetlands_subdiv")
+
+
+async def backfill_parcel_city_names(engine: AsyncEngine, batch_size: int = 5000) -> int:
+    """
+    Fills parcels.city_name for rows loaded before the trigger existed, in small batches so
+    each UPDATE holds its row locks briefly. Only touches NULL rows, so it is safe to re-run.
+    """
+    total = 0
+    async with engine.connect() as conn:
+        while True:
+            result = await conn.execute(text("""
+                UPDATE parcels p
+                SET city_name = COALESCE(
+                    (SELECT c."CITY_NM" FROM texas_cities c WHERE ST_Within(p.geom, c.geometry) LIMIT 1),
+                    'Outside'
+                )
+                WHERE p.gid IN (SELECT gid FROM parcels WHERE city_name IS NULL LIMIT :batch_size)
+            """), {"batch_size": batch_size})
+            if result.rowcount == 0:
+                break
+            total += result.rowcount
+            logger.info(f"Backfilled city_name for {total} parcels so far")
+    logger.info(f"City name backfill done ({total} parcels)")
+    return total
@@ -7,6 +7,7 @@ from pathlib import Path
 from routes import water_router, parcel_router, gis_router,image_router, analysis_router, stripe_router, stripe_billing_router,require_api_token, catalogue_router, scrub_router, prompt_router, lead_client_router, auth_router
 from utils.webdriver_pool import WebDriverPool
 from services.batch import BatchService
+from services.image import shutdown_pil_pool
 from db import init_db
 from config import config
 import logging
@@ -38,6 +39,7 @@ async def lifespan(app: FastAPI):
     asyncio.create_task(BatchService().run_job_scheduler())  
     yield
     await WebDriverPool()._close_drivers()
+    shutdown_pil_pool()
 app = FastAPI(
     title="Land Valuation API",
     description="API for land valuation",
@@ -0,0 +1,65 @@
+"""
+Applies the one-off schema migrations in db/migrations.py.
+
+Run once per database (and again after adding a migration); every statement is idempotent.
+Applying parcels_city_name also backfills city_name for existing parcels.
+Restart the app afterwards so it stops using the fallback queries.
+
+Usage:
+    python migrate_db.py                      # apply everything
+    python migrate_db.py --only parcels_derived_columns
+    python migrate_db.py --list
+    python migrate_db.py --refresh-wetlands   # after reloading the wetlands table
+"""
+
+import asyncio
+import argparse
+import logging
+from typing import List, Optional
+
+from db.migrations import MIGRATIONS, apply_migrations, backfill_parcel_city_names, migration_engine, refresh_wetlands_subdiv
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def refresh_wetlands():
+    engine = migration_engine()
+    try:
+        await refresh_wetlands_subdiv(engine)
+    finally:
+        await engine.dispose()
+
+
+async def migrate(names: Optional[List[str]] = None):
+    engine = migration_engine()
+    try:
+        await apply_migrations(engine, names)
+        if names is None or "parcels_city_name" in names:
+            await backfill_parcel_city_names(engine)
+    finally:
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply one-off schema migrations")
+    parser.add_argument("--only", nargs="+", metavar="NAME", help="Apply only these migrations")
+    parser.add_argument("--list", action="store_true", help="List migrations and exit")
+    parser.add_argument("--refresh-wetlands", action="store_true", help="Refresh wetlands_subdiv after a wetlands reload and exit")
+
+    args = parser.parse_args()
+
+    if args.list:
+        for name in MIGRATIONS:
+            print(name)
+        return
+
+    if args.refresh_wetlands:
+        asyncio.run(refresh_wetlands())
+        return
+
+    asyncio.run(migrate(args.only))
+
+
+if __name__ == "__main__":
+    main()
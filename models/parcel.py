@@ -1,5 +1,8 @@
-from pydantic import BaseModel
+from pydantic import AliasChoices, BaseModel, Field, computed_field
 from typing import List, Optional
+from config import config
+
+_IMG_URL_TEMPLATE = f"{config.IMG_URL}{{gid}}/aerial_{{gid}}.png"
 
 class ParcelResponse(BaseModel):
     gid: int
@@ -8,11 +11,16 @@ class ParcelResponse(BaseModel):
     owner_name: Optional[str] = None
     situs_addr: Optional[str] = None
     county: Optional[str] = None
-    acreage: Optional[str] = None  # Acreage from legal_area
-    image_url: Optional[str] = None
+    acreage: Optional[str] = Field(default=None, validation_alias=AliasChoices("acreage", "legal_area"))  # Acreage from legal_area
 
     class Config:
         from_attributes = True
+        populate_by_name = True
+
+    @computed_field
+    @property
+    def image_url(self) -> str:
+        return _IMG_URL_TEMPLATE.format(gid=self.gid)
 
 
 class AdjacencyCheckRequest(BaseModel):
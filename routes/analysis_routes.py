@@ -16,12 +16,18 @@ logger = logging.getLogger(__name__)
 router = APIRouter(tags=["Batch Analysis"])
 
 @router.get("/analyze/{gid}", response_model=Optional[Dict[str, Any]])
-async def parcel_analysis(gid: int,db: AsyncSession = Depends(get_session)) -> Optional[Dict[str, Any]]:
+async def parcel_analysis(gid: int, force_refresh_analysis: bool = False, force_refresh_images: bool = False,
+                          db: AsyncSession = Depends(get_session)) -> Optional[Dict[str, Any]]:
     """
     Analyze a single parcel immediately (synchronous).
+    force_refresh_analysis reruns the GIS analyses but keeps stored image URLs.
     """
     service = batch_service.analysis_service
-    result = await service.get_analysis(gid=gid, db=db)
+    result = await service.get_analysis(
+        gid=gid, db=db,
+        force_refresh_analysis=force_refresh_analysis,
+        force_refresh_images=force_refresh_images,
+    )
     return result
 
 @router.post("/analyze/batch", response_model=BatchJob)
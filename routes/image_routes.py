@@ -57,4 +57,12 @@ async def get_water_image(gid: Optional[int] = None, geom: Optional[str] = None,
     result = await image_service.get_water_image(db, gid=gid, geom=geom)
     if isinstance(result, dict):
         return JSONResponse(content=result)    
-    return JSONResponse(content={"image_url": result})
\ No newline at end of file
+    return JSONResponse(content={"image_url": result})
+
+
+@router.get("/all", summary="Get All Images For A Parcel")
+async def get_all_images(gid: Optional[int] = None, geom: Optional[str] = None, db: AsyncSession = Depends(get_session)):
+    if not gid and not geom:
+        raise HTTPException(status_code=400, detail="Either 'gid' or 'geom' must be provided.")
+    result = await image_service.get_all_images(db, gid=gid, geom=geom)
+    return JSONResponse(content=result)
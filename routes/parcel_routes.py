@@ -19,10 +19,12 @@ search_router = APIRouter(prefix="/search", tags=["Search"])
 async def search_parcel_by_id(
     prop_id: Optional[str] = None,
     county: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
     db_sess: AsyncSession = Depends(get_session),
 ):
     try:
-        results = await search_parcel.get_by_filters(db_sess, prop_id, county)
+        results = await search_parcel.get_by_filters(db_sess, prop_id, county, limit=limit, offset=offset)
         return results
     except Exception as e:
         logger.error(f"Error searching parcels: {str(e)}")
@@ -74,10 +76,12 @@ async def search_parcel_by_owner(
 async def search_parcel_by_propid(
     prop_id: str,
     county: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
     db_sess: AsyncSession = Depends(get_session),
 ):
     try:
-        results = await search_parcel.get_by_filters(db_sess, prop_id, county)
+        results = await search_parcel.get_by_filters(db_sess, prop_id, county, limit=limit, offset=offset)
         return results
     except Exception as e:
         logger.error(f"Error searching parcels by property ID: {str(e)}")
@@ -5,12 +5,13 @@ These endpoints allow the dashboard to list and download CSV files
 that have been scrubbed and stored in the attom-scrubber-data S3 bucket.
 """
 
+import asyncio
 import logging
 from datetime import datetime
 from typing import Optional
 
 from fastapi import APIRouter, HTTPException, Query, UploadFile, File
-from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi.responses import JSONResponse, RedirectResponse, StreamingResponse
 from pydantic import BaseModel
 
 from services.s3 import s3_scrub_service
@@ -114,7 +115,8 @@ async def upload_file(
         content_type = "text/csv" if file.filename.lower().endswith('.csv') else "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
 
         # Upload to S3
-        result = s3_scrub_service.upload_file(
+        result = await asyncio.to_thread(
+            s3_scrub_service.upload_file,
             file_content=content,
             filename=file.filename,
             content_type=content_type,
@@ -151,11 +153,11 @@ async def list_uploaded_files(
         List of uploaded file metadata.
     """
     try:
-        files = s3_scrub_service.list_uploaded_files(prefix=prefix)
+        files = await asyncio.to_thread(s3_scrub_service.list_uploaded_files, prefix=prefix)
         limited_files = files[:limit]
 
         return FileListResponse(
-            files=[FileInfo(**f) for f in limited_files],
+            files=[FileInfo(**f.to_dict()) for f in limited_files],
             total_count=len(files),
             directory=prefix,
         )
@@ -181,13 +183,13 @@ async def list_scrubbed_files(
         List of file metadata including name, size, and last modified date.
     """
     try:
-        files = s3_scrub_service.list_scrubbed_files(prefix=directory)
+        files = await asyncio.to_thread(s3_scrub_service.list_scrubbed_files, prefix=directory)
 
         # Apply limit
         limited_files = files[:limit]
 
         return FileListResponse(
-            files=[FileInfo(**f) for f in limited_files],
+            files=[FileInfo(**f.to_dict()) for f in limited_files],
             total_count=len(files),
             directory=directory,
         )
@@ -206,7 +208,7 @@ async def list_directories() -> DirectoryListResponse:
         List of directory names sorted by date (newest first).
     """
     try:
-        directories = s3_scrub_service.list_directories()
+        directories = await asyncio.to_thread(s3_scrub_service.list_directories)
         return DirectoryListResponse(
             directories=directories,
             total_count=len(directories),
@@ -230,11 +232,11 @@ async def download_file(file_path: str) -> StreamingResponse:
     """
     try:
         # Check if file exists
-        if not s3_scrub_service.file_exists(file_path):
+        if not await asyncio.to_thread(s3_scrub_service.file_exists, file_path):
             raise HTTPException(status_code=404, detail=f"File not found: {file_path}")
 
         # Get file stream
-        file_stream = s3_scrub_service.get_file_stream(file_path)
+        file_stream = await asyncio.to_thread(s3_scrub_service.get_file_stream, file_path)
 
         # Extract filename for Content-Disposition
         filename = file_path.split("/")[-1]
@@ -254,6 +256,34 @@ async def download_file(file_path: str) -> StreamingResponse:
         raise HTTPException(status_code=500, detail=f"Failed to download file: {str(e)}")
 
 
+@router.get("/download-redirect/{file_path:path}")
+async def download_file_redirect(file_path: str) -> RedirectResponse:
+    """
+    Redirect to a presigned S3 URL for a scrubbed CSV file.
+
+    The browser downloads straight from S3, so large files don't pass
+    through the API process.
+
+    Args:
+        file_path: Relative path to the file (e.g., '2025-01-06/scrubbed_part_1.csv').
+
+    Returns:
+        302 redirect to the presigned download URL.
+    """
+    try:
+        if not await asyncio.to_thread(s3_scrub_service.file_exists, file_path):
+            raise HTTPException(status_code=404, detail=f"File not found: {file_path}")
+
+        url = await asyncio.to_thread(s3_scrub_service.download_url, file_path)
+        return RedirectResponse(url, status_code=302)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to generate download URL for {file_path}: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to generate URL: {str(e)}")
+
+
 @router.get("/presigned-url/{file_path:path}", response_model=PresignedUrlResponse)
 async def get_presigned_url(
     file_path: str,
@@ -273,10 +303,10 @@ async def get_presigned_url(
         Presigned URL that can be used for direct S3 download.
     """
     try:
-        if not s3_scrub_service.file_exists(file_path):
+        if not await asyncio.to_thread(s3_scrub_service.file_exists, file_path):
             raise HTTPException(status_code=404, detail=f"File not found: {file_path}")
 
-        url = s3_scrub_service.get_presigned_url(file_path, expiration=expiration)
+        url = await asyncio.to_thread(s3_scrub_service.get_presigned_url, file_path, expiration=expiration)
 
         return PresignedUrlResponse(
             url=url,
@@ -303,10 +333,10 @@ async def delete_file(file_path: str) -> JSONResponse:
         Success message.
     """
     try:
-        if not s3_scrub_service.file_exists(file_path):
+        if not await asyncio.to_thread(s3_scrub_service.file_exists, file_path):
             raise HTTPException(status_code=404, detail=f"File not found: {file_path}")
 
-        s3_scrub_service.delete_file(file_path)
+        await asyncio.to_thread(s3_scrub_service.delete_file, file_path)
 
         return JSONResponse(
             content={
@@ -334,7 +364,7 @@ async def delete_directory(directory: str) -> JSONResponse:
         Success message with count of deleted files.
     """
     try:
-        deleted_count = s3_scrub_service.delete_directory(directory)
+        deleted_count = await asyncio.to_thread(s3_scrub_service.delete_directory, directory)
 
         if deleted_count == 0:
             return JSONResponse(
@@ -368,8 +398,10 @@ async def health_check() -> JSONResponse:
     """
     try:
         # Try to list a few files to verify connectivity
-        files = s3_scrub_service.list_scrubbed_files()
-        directories = s3_scrub_service.list_directories()
+        files, directories = await asyncio.gather(
+            asyncio.to_thread(s3_scrub_service.list_scrubbed_files),
+            asyncio.to_thread(s3_scrub_service.list_directories),
+        )
 
         return JSONResponse(
             content={
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, Header
 from services import water_service as service
-from db import get_session
+from db import get_session, get_session_factory
 
 router = APIRouter(prefix="/water_analysis", tags=["Water Analysis"])
 
@@ -84,3 +84,15 @@ async def analyze_wetlands(gid: int ,session=Depends(get_session)):
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/all")
+async def analyze_all(gid: int, session_factory=Depends(get_session_factory)):
+    """
+    Run every water analysis for the specified database GID concurrently.
+    """
+    try:
+        result = await service.analyze_all(session_factory, gid=gid)
+        return result
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
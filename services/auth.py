@@ -1,5 +1,8 @@
+import hashlib
+import time
 from datetime import datetime, timedelta
 from typing import Optional
+from cachetools import TTLCache
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -19,6 +22,11 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 # HTTP Bearer token security
 security = HTTPBearer()
 
+# Decoded payloads of recently verified tokens, keyed by a token digest, so repeat requests
+# skip signature verification. Expiry is still checked on every hit, and get_current_user
+# re-reads the user (is_active) each time.
+_token_cache: TTLCache = TTLCache(maxsize=10_000, ttl=30)
+
 class AuthService:
     """
     Authentication service for user signin and JWT token management.
@@ -97,12 +105,23 @@ class AuthService:
         Returns:
             Decoded token payload if valid, None otherwise
         """
+        cache_key = hashlib.sha256(token.encode()).digest()[:16]
+        payload = _token_cache.get(cache_key)
+        if payload is not None:
+            exp = payload.get("exp")
+            if exp is None or exp > time.time():
+                return dict(payload)
+            _token_cache.pop(cache_key, None)
+            logger.warning("Token verification failed: Signature has expired.")
+            return None
+
         try:
             payload = jwt.decode(
                 token,
                 config.JWT_SECRET_KEY,
                 algorithms=[config.JWT_ALGORITHM]
             )
+            _token_cache[cache_key] = dict(payload)
             return payload
         except JWTError as e:
             logger.warning(f"Token verification failed: {e}")
@@ -1,15 +1,17 @@
 import os
+import csv
 import asyncio
 import logging
 import pandas as pd
+import time
 import uuid
 from io import BytesIO
-from typing import Any, Dict, List, Tuple, Optional, Callable
+from typing import Any, Dict, Iterable, Iterator, List, Tuple, Optional, Callable
 from datetime import datetime
 from fastapi import UploadFile
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.sql import text, select, func
+from sqlalchemy.sql import text, select, func, update
 
 from db import SessionLocal
 from models.job import BatchJob, JobStatus, JobPriority
@@ -18,6 +20,9 @@ from .parcel_analysis import AnalysisService
 from config import config
 batch_logger = logging.getLogger("batch_analysis")
 
+# Minimum seconds between progress writes for a running job (the final row always writes).
+PROGRESS_WRITE_INTERVAL = 0.5
+
 class BatchService:
     _instance: Optional["BatchService"] = None
     analysis_service: Optional[AnalysisService]
@@ -35,16 +40,17 @@ class BatchService:
         batch_logger.info("Checking for stuck jobs from previous run...")
         async with SessionLocal() as db:
             result = await db.execute(
-                select(BatchJob).where(BatchJob.status == JobStatus.PROCESSING)
+                update(BatchJob)
+                .where(BatchJob.status == JobStatus.PROCESSING)
+                .values(
+                    status=JobStatus.FAILED,
+                    error_message="System Restarted: Job interrupted unexpectedly.",
+                    completed_at=datetime.utcnow(),
+                )
+                .returning(BatchJob.job_id)
             )
-            stuck_jobs = result.scalars().all()
-            
-            for job in stuck_jobs:
-                batch_logger.warning(f"Recovering stuck job {job.job_id} -> FAILED")
-                job.status = JobStatus.FAILED
-                job.error_message = "System Restarted: Job interrupted unexpectedly."
-                job.completed_at = datetime.utcnow()
-                db.add(job)
+            for job_id in result.scalars().all():
+                batch_logger.warning(f"Recovering stuck job {job_id} -> FAILED")
             await db.commit()
 
     async def run_job_scheduler(self):
@@ -88,7 +94,7 @@ class BatchService:
         Saves file and creates a QUEUED job record.
         """
         job_id = uuid.uuid4().hex
-        temp_dir = config.UPLOAD_DIR if hasattr(config, 'UPLOAD_DIR') else "./uploads"
+        temp_dir = config.UPLOAD_DIR
         os.makedirs(temp_dir, exist_ok=True)
         filename = file.filename or "upload"
         relative_path = os.path.join(temp_dir, f"{job_id}_{filename}")
@@ -120,22 +126,29 @@ class BatchService:
         The worker logic. Now fetches details from DB instead of arguments.
         """
         job_state = {"cancelled": False}
+        progress = {"failed": 0, "last_write": 0.0}
+        progress_lock = asyncio.Lock()
 
-        async def on_progress(completed, total, is_success=True):
-            if completed % 10 == 0 or completed == total:
-                async with SessionLocal() as db:
-                    job = await db.get(BatchJob, job_id)
-                    if not job: return
-                    if job.status == JobStatus.CANCELLED:
-                        job_state["cancelled"] = True
-                        return
-                    job.completed_rows = completed
-                    job.total_rows = total
-                    if not is_success:
-                        job.failed_rows += 1
-                    db.add(job)
-                    await db.commit()
         async with SessionLocal() as db:
+            async def on_progress(completed, total, is_success=True):
+                # Rows finish concurrently; coalesce their progress into at most one write per
+                # PROGRESS_WRITE_INTERVAL on the job's own session (the lock serializes its use).
+                if not is_success:
+                    progress["failed"] += 1
+                now = time.monotonic()
+                if completed != total and now - progress["last_write"] < PROGRESS_WRITE_INTERVAL:
+                    return
+                progress["last_write"] = now
+                async with progress_lock:
+                    result = await db.execute(
+                        update(BatchJob)
+                        .where(BatchJob.job_id == job_id, BatchJob.status != JobStatus.CANCELLED)
+                        .values(completed_rows=completed, total_rows=total, failed_rows=progress["failed"])
+                    )
+                    await db.commit()
+                if result.rowcount == 0:
+                    job_state["cancelled"] = True
+
             try:
                 job = await db.get(BatchJob, job_id)
                 if not job or job.status == JobStatus.CANCELLED:
@@ -149,21 +162,27 @@ class BatchService:
                     progress_callback=on_progress,
                     job_state=job_state # Pass cancellation context
                 )
-                await db.refresh(job)
-                if job.status == JobStatus.CANCELLED:
+                status = (
+                    await db.execute(select(BatchJob.status).where(BatchJob.job_id == job_id))
+                ).scalar_one()
+                if status == JobStatus.CANCELLED:
                     return
-                flattened = self.flatten_analysis_results(result["results"])
-                df = pd.DataFrame(flattened)
                 output_dir = "/tmp/exports"
                 os.makedirs(output_dir, exist_ok=True)
                 output_path = f"{output_dir}/results_{job_id}.csv"
-                df.to_csv(output_path, index=False)
-                job.status = JobStatus.COMPLETED
-                job.completed_at = datetime.utcnow()
-                job.completed_rows = len(flattened)
-                job.total_rows = len(flattened)
-                job.result_url = output_path
-                db.add(job)
+                row_count = await asyncio.to_thread(self.write_results_csv, result["results"], output_path)
+                # Conditional, so a cancel that lands while the CSV is written is not overwritten.
+                await db.execute(
+                    update(BatchJob)
+                    .where(BatchJob.job_id == job_id, BatchJob.status != JobStatus.CANCELLED)
+                    .values(
+                        status=JobStatus.COMPLETED,
+                        completed_at=datetime.utcnow(),
+                        completed_rows=row_count,
+                        total_rows=row_count,
+                        result_url=output_path,
+                    )
+                )
                 await db.commit()
 
             except Exception as e:
@@ -178,9 +197,11 @@ class BatchService:
                         err_db.add(job)
                         await err_db.commit()
             finally:
-                if job and job.file_path and os.path.exists(job.file_path):
-                    try: os.remove(job.file_path)
-                    except: pass
+                if job and job.file_path:
+                    try: await asyncio.to_thread(os.unlink, job.file_path)
+                    except FileNotFoundError: pass
+                    except OSError as e:
+                        batch_logger.warning(f"Could not remove upload {job.file_path} for job {job_id}: {e}")
     async def _fetch_gids_bulk(self, points: List[Tuple[int, float, float]], db: AsyncSession) -> Dict[int, int]:
         results: Dict[int, int] = {}
         BATCH_SIZE = 1000 
@@ -254,7 +275,7 @@ class BatchService:
             county_master_map = {c.county.lower().strip(): c.master_phone for c in clients if c.county}
         except Exception as e:
             batch_logger.error(f"Failed to load Lead Clients for phone injection: {e}")
-        concurrency_limit = config.BATCH_CONCURRENCY if hasattr(config, 'BATCH_CONCURRENCY') else 10
+        concurrency_limit = config.BATCH_CONCURRENCY
         sem = asyncio.Semaphore(concurrency_limit)
         completed_count = 0
         async def _process_row(idx: int, row_data: Dict):
@@ -300,8 +321,29 @@ class BatchService:
         results = await asyncio.gather(*tasks)
         results = [r for r in results if r is not None]
         return {"results": results, "batch_id": job_id}
+    @classmethod
+    def write_results_csv(cls, results: List[Dict], output_path: str) -> int:
+        """
+        Flattens results row by row straight into a CSV and returns the row count.
+        Columns are the union of all row keys in first-seen order (failed rows carry
+        fewer keys than analysed ones), so keys are gathered in a first pass and rows
+        are re-flattened while writing instead of holding a flattened copy of the job.
+        """
+        fieldnames = list(dict.fromkeys(key for row in cls.flatten_analysis_results_iter(results) for key in row))
+        count = 0
+        with open(output_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames, restval="")
+            writer.writeheader()
+            for row in cls.flatten_analysis_results_iter(results):
+                writer.writerow(row)
+                count += 1
+        return count
+
     def flatten_analysis_results(self, results: List[Dict]) -> List[Dict]:
-        flattened = []
+        return list(self.flatten_analysis_results_iter(results))
+
+    @staticmethod
+    def flatten_analysis_results_iter(results: Iterable[Dict]) -> Iterator[Dict]:
         for row in results:
             flat = {k: v for k, v in row.items() if k != "analysis"}
             analysis = row.get("analysis", {})
@@ -320,5 +362,4 @@ class BatchService:
                 flat["img_parcel"] = analysis.get("image_url")
                 flat["img_flood"] = analysis.get("flood_image_url")
                 flat["img_topo"] = analysis.get("contour_image_url")
-            flattened.append(flat)
-        return flattened
\ No newline at end of file
+            yield flat
\ No newline at end of file
@@ -8,9 +8,106 @@ from shapely.geometry import shape, mapping
 from shapely import wkt
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import text
-from typing import Dict, Any, Optional, Tuple
+from typing import Dict, Any, List, Optional, Tuple
+from utils.spatial_sql import fetch_query_parts, to_ewkb
 logger = logging.getLogger(__name__)
 
+# Each analysis is a set of labeled SELECTs run as one statement (utils.spatial_sql.fetch_query_parts),
+# so AnalysisService can fuse them across analyses into a single round trip. The target
+# geometry is bound once as :ewkb (see utils.spatial_sql.to_ewkb).
+GAS_PIPELINES_QUERIES = {
+    "rows": """
+        SELECT oper_nm, sys_nm, diameter, commodity1, pline_id, subsys_nm, cmdty_desc
+        FROM gas_pipelines 
+        WHERE ST_Intersects(geom, ST_GeomFromEWKB(:ewkb))
+    """,
+    "nearest": """
+        SELECT oper_nm, sys_nm, diameter, commodity1, 
+               ST_Distance(ST_GeomFromEWKB(:ewkb)::geography, geom::geography) as dist
+        FROM gas_pipelines
+        ORDER BY geom <-> ST_GeomFromEWKB(:ewkb)
+        LIMIT 1
+    """,
+}
+ELECTRIC_LINES_QUERIES = {
+    "rows": """
+        SELECT owner, voltage, type, volt_class, naics_desc
+        FROM electric_transmission_lines 
+        WHERE ST_Intersects(geom, ST_GeomFromEWKB(:ewkb))
+    """,
+    "nearest": """
+        SELECT owner, voltage, type,
+               ST_Distance(ST_GeomFromEWKB(:ewkb)::geography, geom::geography) as dist
+        FROM electric_transmission_lines
+        ORDER BY geom <-> ST_GeomFromEWKB(:ewkb)
+        LIMIT 1
+    """,
+}
+ROAD_FRONTAGE_QUERIES = {
+    "row": """
+        WITH parcel_geom_tab AS (
+            -- Transform input WKT (assumed 4326) to 3083 for metric analysis
+            SELECT ST_Transform(ST_GeomFromEWKB(:ewkb), 3083) as geom
+        ),
+        nearby_roads AS (
+            -- Select directly from osm_roads using the pre-projected geom_3083 column
+            SELECT geom_3083 as geom
+            FROM osm_roads, parcel_geom_tab p
+            -- Use the metric index directly (faster and more accurate than the previous degree mix)
+            WHERE ST_DWithin(geom_3083, p.geom, 25)
+        ),
+        merged_roads AS (
+            SELECT ST_Union(geom) as geom FROM nearby_roads
+        ),
+        raw_frontage AS (
+            SELECT 
+                CASE 
+                    WHEN mr.geom IS NULL THEN 0
+                    -- Calculate intersection of parcel boundary with 25m buffered road
+                    ELSE ST_Length(ST_Intersection(ST_Boundary(p.geom), ST_Buffer(mr.geom, 25))) 
+                END as len_m
+            FROM parcel_geom_tab p
+            LEFT JOIN merged_roads mr ON true
+        ),
+        interior_roads AS (
+            SELECT COALESCE(SUM(ST_Length(ST_Intersection(nr.geom, p.geom))), 0) as len_m
+            FROM nearby_roads nr, parcel_geom_tab p
+            WHERE ST_Intersects(nr.geom, p.geom)
+        )
+        SELECT 
+            rf.len_m * 3.28084 as frontage_ft, 
+            ir.len_m * 3.28084 as interior_ft,
+            (SELECT COUNT(*) FROM nearby_roads) as access_count
+        FROM raw_frontage rf, interior_roads ir
+    """,
+}
+BUILDABLE_AREA_QUERIES = {
+    "row": """
+        WITH target AS (
+            SELECT ST_Transform(ST_GeomFromEWKB(:ewkb), 3083) as geom
+        ),
+        constraints AS (
+            -- Combine Flood and Wetlands
+            SELECT ST_Union(geom) as geom FROM (
+                SELECT ST_Transform(geom, 3083) as geom FROM tx_fld_haz 
+                WHERE ST_Intersects(geom, ST_Transform(ST_GeomFromEWKB(:ewkb), 3083))
+                UNION ALL
+                SELECT ST_Transform(geom, 3083) as geom FROM wetlands 
+                WHERE ST_Intersects(geom, ST_Transform(ST_GeomFromEWKB(:ewkb), 3083))
+                UNION ALL
+                SELECT ST_Transform(geom, 3083) as geom FROM radcorp_water
+                WHERE ST_Intersects(geom, ST_Transform(ST_GeomFromEWKB(:ewkb), 3083))
+            ) as combined
+        )
+        SELECT 
+            ST_Area(target.geom) / 4046.86 as total_acres,
+            -- Fix: Explicitly set SRID for the empty collection fallback to match target (3083)
+            ST_Area(ST_Intersection(target.geom, COALESCE(constraints.geom, ST_SetSRID('GEOMETRYCOLLECTION EMPTY'::geometry, 3083)))) / 4046.86 as unbuildable_acres
+        FROM target LEFT JOIN constraints ON true
+    """,
+}
+
+
 class GISAnalysisService:
     """
     Centralized, optimized service for all GIS analysis (Vector & Raster).
@@ -60,42 +157,30 @@ class GISAnalysisService:
         raise ValueError("Either 'gid' or 'geom_input' must be provided.")
     async def analyze_gas_pipelines(self, session: AsyncSession, gid: Optional[int] = None, geom: Optional[str] = None) -> Dict[str, Any]:
         """Checks intersection with Gas Pipelines using optimized spatial query."""
-        target_wkt, _ = await self._get_target_geometry(session, gid, geom)
-        sql = text("""
-            SELECT oper_nm, sys_nm, diameter, commodity1, pline_id, subsys_nm, cmdty_desc
-            FROM gas_pipelines 
-            WHERE ST_Intersects(geom, ST_SetSRID(ST_GeomFromText(:wkt), 4326))
-        """)
-        res = await session.execute(sql, {"wkt": target_wkt})
-        rows = res.fetchall()
+        _, shapely_geom = await self._get_target_geometry(session, gid, geom)
+        data = await fetch_query_parts(session, GAS_PIPELINES_QUERIES, {"ewkb": to_ewkb(shapely_geom)})
+        return self.summarize_gas_pipelines(data)
+    def summarize_gas_pipelines(self, data: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
         pipelines = [
             {
-                "Operator": r[0], 
-                "System": r[1], 
-                "Diameter": r[2], 
-                "Commodity": r[3],
-                "PipelineID": r[4],
-                "Subsystem": r[5],
-                "Description": r[6]
-            } for r in rows
+                "Operator": r["oper_nm"], 
+                "System": r["sys_nm"], 
+                "Diameter": r["diameter"], 
+                "Commodity": r["commodity1"],
+                "PipelineID": r["pline_id"],
+                "Subsystem": r["subsys_nm"],
+                "Description": r["cmdty_desc"]
+            } for r in data["rows"]
         ]
         if not pipelines:
-            nearest_sql = text("""
-                SELECT oper_nm, sys_nm, diameter, commodity1, 
-                       ST_Distance(ST_SetSRID(ST_GeomFromText(:wkt), 4326)::geography, geom::geography) as dist
-                FROM gas_pipelines
-                ORDER BY geom <-> ST_SetSRID(ST_GeomFromText(:wkt), 4326)
-                LIMIT 1
-            """)
-            near_res = await session.execute(nearest_sql, {"wkt": target_wkt})
-            nearest = near_res.fetchone()
+            nearest = data["nearest"][0] if data["nearest"] else None
             nearest_info = None
             if nearest:
                 nearest_info = {
-                    "Operator": nearest[0],
-                    "System": nearest[1],
-                    "Diameter": nearest[2],
-                    "Distance_Meters": round(nearest[4], 2)
+                    "Operator": nearest["oper_nm"],
+                    "System": nearest["sys_nm"],
+                    "Diameter": nearest["diameter"],
+                    "Distance_Meters": round(nearest["dist"], 2)
                 }
             return {"intersects": False, "count": 0, "details": [], "nearest": nearest_info}
 
@@ -106,40 +191,28 @@ class GISAnalysisService:
         }
     async def analyze_electric_lines(self, session: AsyncSession, gid: Optional[int] = None, geom: Optional[str] = None) -> Dict[str, Any]:
         """Checks intersection with Electric Transmission Lines."""
-        target_wkt, _ = await self._get_target_geometry(session, gid, geom)
-        sql = text("""
-            SELECT owner, voltage, type, volt_class, naics_desc
-            FROM electric_transmission_lines 
-            WHERE ST_Intersects(geom, ST_SetSRID(ST_GeomFromText(:wkt), 4326))
-        """)
-        res = await session.execute(sql, {"wkt": target_wkt})
-        rows = res.fetchall()
+        _, shapely_geom = await self._get_target_geometry(session, gid, geom)
+        data = await fetch_query_parts(session, ELECTRIC_LINES_QUERIES, {"ewkb": to_ewkb(shapely_geom)})
+        return self.summarize_electric_lines(data)
+    def summarize_electric_lines(self, data: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
         lines = [
             {
-                "Owner": r[0], 
-                "Voltage": r[1], 
-                "Type": r[2], 
-                "Class": r[3],
-                "Description": r[4]
-            } for r in rows
+                "Owner": r["owner"], 
+                "Voltage": r["voltage"], 
+                "Type": r["type"], 
+                "Class": r["volt_class"],
+                "Description": r["naics_desc"]
+            } for r in data["rows"]
         ]
         if not lines:
-             nearest_sql = text("""
-                SELECT owner, voltage, type,
-                       ST_Distance(ST_SetSRID(ST_GeomFromText(:wkt), 4326)::geography, geom::geography) as dist
-                FROM electric_transmission_lines
-                ORDER BY geom <-> ST_SetSRID(ST_GeomFromText(:wkt), 4326)
-                LIMIT 1
-            """)
-             near_res = await session.execute(nearest_sql, {"wkt": target_wkt})
-             nearest = near_res.fetchone()
+             nearest = data["nearest"][0] if data["nearest"] else None
              nearest_info = None
              if nearest:
                  nearest_info = {
-                     "Owner": nearest[0],
-                     "Voltage": nearest[1],
-                     "Type": nearest[2],
-                     "Distance_Meters": round(nearest[3], 2)
+                     "Owner": nearest["owner"],
+                     "Voltage": nearest["voltage"],
+                     "Type": nearest["type"],
+                     "Distance_Meters": round(nearest["dist"], 2)
                  }
              return {"intersects": False, "count": 0, "details": [], "nearest": nearest_info}
 
@@ -151,110 +224,53 @@ class GISAnalysisService:
     
     async def analyze_road_frontage(self, session: AsyncSession, gid: Optional[int] = None, geom: Optional[str] = None) -> Dict[str, Any]:
     
-        target_wkt, _ = await self._get_target_geometry(session, gid, geom)
-        
-        sql = text("""
-            WITH parcel_geom_tab AS (
-                -- Transform input WKT (assumed 4326) to 3083 for metric analysis
-                SELECT ST_Transform(ST_SetSRID(ST_GeomFromText(:wkt), 4326), 3083) as geom
-            ),
-            nearby_roads AS (
-                -- Select directly from osm_roads using the pre-projected geom_3083 column
-                SELECT geom_3083 as geom
-                FROM osm_roads, parcel_geom_tab p
-                -- Use the metric index directly (faster and more accurate than the previous degree mix)
-                WHERE ST_DWithin(geom_3083, p.geom, 25)
-            ),
-            merged_roads AS (
-                SELECT ST_Union(geom) as geom FROM nearby_roads
-            ),
-            raw_frontage AS (
-                SELECT 
-                    CASE 
-                        WHEN mr.geom IS NULL THEN 0
-                        -- Calculate intersection of parcel boundary with 25m buffered road
-                        ELSE ST_Length(ST_Intersection(ST_Boundary(p.geom), ST_Buffer(mr.geom, 25))) 
-                    END as len_m
-                FROM parcel_geom_tab p
-                LEFT JOIN merged_roads mr ON true
-            ),
-            interior_roads AS (
-                SELECT COALESCE(SUM(ST_Length(ST_Intersection(nr.geom, p.geom))), 0) as len_m
-                FROM nearby_roads nr, parcel_geom_tab p
-                WHERE ST_Intersects(nr.geom, p.geom)
-            )
-            SELECT 
-                rf.len_m * 3.28084 as frontage_ft, 
-                ir.len_m * 3.28084 as interior_ft,
-                (SELECT COUNT(*) FROM nearby_roads) as access_count
-            FROM raw_frontage rf, interior_roads ir
-        """)
-
+        _, shapely_geom = await self._get_target_geometry(session, gid, geom)
         try:
-            res = await session.execute(sql, {"wkt": target_wkt})
-            row = res.fetchone()
-            
-            raw_frontage = float(row[0]) if row else 0.0
-            interior_len = float(row[1]) if row else 0.0
-            access_count = row[2] if row else 0
-            adjusted_frontage = max(raw_frontage - interior_len, 0.0)
-            
-            return {
-                "length_ft": round(adjusted_frontage, 2),
-                "intersects": adjusted_frontage > 0,
-                "road_in_parcel_feet": round(interior_len, 2),
-                "road_access_count": access_count,
-                "raw_boundary_feet": round(raw_frontage, 2)
-            }
+            data = await fetch_query_parts(session, ROAD_FRONTAGE_QUERIES, {"ewkb": to_ewkb(shapely_geom)})
+            return self.summarize_road_frontage(data)
         except Exception as e:
             logger.error(f"Road frontage analysis failed: {repr(e)}") 
             return {}  
+    def summarize_road_frontage(self, data: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
+        row = data["row"][0] if data["row"] else None
+        
+        raw_frontage = float(row["frontage_ft"]) if row else 0.0
+        interior_len = float(row["interior_ft"]) if row else 0.0
+        access_count = row["access_count"] if row else 0
+        adjusted_frontage = max(raw_frontage - interior_len, 0.0)
+        
+        return {
+            "length_ft": round(adjusted_frontage, 2),
+            "intersects": adjusted_frontage > 0,
+            "road_in_parcel_feet": round(interior_len, 2),
+            "road_access_count": access_count,
+            "raw_boundary_feet": round(raw_frontage, 2)
+        }
     async def analyze_buildable_area(self, session: AsyncSession, gid: Optional[int] = None, geom: Optional[str] = None) -> Dict[str, Any]:
         """
         Calculates buildable area by subtracting Flood Zones and Wetlands from Total Area.
         Uses EPSG:3083 for accurate area calculation in Texas.
         FIX: Handles SRID mismatch by enforcing SRID on empty geometry fallback.
         """
-        target_wkt, _ = await self._get_target_geometry(session, gid, geom)
-        query = text("""
-            WITH target AS (
-                SELECT ST_Transform(ST_SetSRID(ST_GeomFromText(:wkt), 4326), 3083) as geom
-            ),
-            constraints AS (
-                -- Combine Flood and Wetlands
-                SELECT ST_Union(geom) as geom FROM (
-                    SELECT ST_Transform(geom, 3083) as geom FROM tx_fld_haz 
-                    WHERE ST_Intersects(geom, ST_Transform(ST_SetSRID(ST_GeomFromText(:wkt), 4326), 3083))
-                    UNION ALL
-                    SELECT ST_Transform(geom, 3083) as geom FROM wetlands 
-                    WHERE ST_Intersects(geom, ST_Transform(ST_SetSRID(ST_GeomFromText(:wkt), 4326), 3083))
-                    UNION ALL
-                    SELECT ST_Transform(geom, 3083) as geom FROM radcorp_water
-                    WHERE ST_Intersects(geom, ST_Transform(ST_SetSRID(ST_GeomFromText(:wkt), 4326), 3083))
-                ) as combined
-            )
-            SELECT 
-                ST_Area(target.geom) / 4046.86 as total_acres,
-                -- Fix: Explicitly set SRID for the empty collection fallback to match target (3083)
-                ST_Area(ST_Intersection(target.geom, COALESCE(constraints.geom, ST_SetSRID('GEOMETRYCOLLECTION EMPTY'::geometry, 3083)))) / 4046.86 as unbuildable_acres
-            FROM target LEFT JOIN constraints ON true;
-        """)
+        _, shapely_geom = await self._get_target_geometry(session, gid, geom)
         try:
-            res = await session.execute(query, {"wkt": target_wkt})
-            row = res.fetchone()
-            
-            total_acres = float(row[0]) if row and row[0] else 0.0
-            unbuildable_acres = float(row[1]) if row and row[1] else 0.0
-            buildable_acres = max(0.0, total_acres - unbuildable_acres)
-            return {
-                "total_acres": round(total_acres, 2),
-                "unbuildable_acres": round(unbuildable_acres, 2),
-                "buildable_acres": round(buildable_acres, 2),
-                "buildable_percentage": round((buildable_acres / total_acres * 100), 1) if total_acres > 0 else 0
-            }
+            data = await fetch_query_parts(session, BUILDABLE_AREA_QUERIES, {"ewkb": to_ewkb(shapely_geom)})
+            return self.summarize_buildable_area(data)
         except Exception as e:
             logger.error(f"Buildable area analysis failed: {e}")
             return {"error": str(e)}
+    def summarize_buildable_area(self, data: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
+        row = data["row"][0] if data["row"] else None
+        
+        total_acres = float(row["total_acres"]) if row and row["total_acres"] else 0.0
+        unbuildable_acres = float(row["unbuildable_acres"]) if row and row["unbuildable_acres"] else 0.0
+        buildable_acres = max(0.0, total_acres - unbuildable_acres)
+        return {
+            "total_acres": round(total_acres, 2),
+            "unbuildable_acres": round(unbuildable_acres, 2),
+            "buildable_acres": round(buildable_acres, 2),
+            "buildable_percentage": round((buildable_acres / total_acres * 100), 1) if total_acres > 0 else 0
+        }
     async def analyze_elevation_change(self, session: AsyncSession, gid: Optional[int] = None, geom: Optional[str] = None) -> Dict[str, Any]:
         """Calculates Min, Max, and Change in elevation using local DEM raster."""
         _, shapely_geom = await self._get_target_geometry(session, gid, geom)
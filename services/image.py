@@ -1,33 +1,182 @@
 import os
 import json
 import logging
-import time
 import uuid
 import hashlib
 import base64
 import asyncio
+import multiprocessing
 from io import BytesIO
+from concurrent.futures import ProcessPoolExecutor
 from typing import Dict, Optional, Union, Tuple, List, Any
 import boto3
+from cachetools import TTLCache
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config as BotoConfig
 import numpy as np
 import rasterio
-from rasterio.mask import mask
+from rasterio.windows import from_bounds
+from rasterio.features import geometry_mask
 from PIL import Image
-import folium
-import geopandas as gpd
-from shapely.geometry import shape, mapping
-from shapely import wkt
+from pyproj import Transformer
+import shapely
+from shapely.geometry import mapping, box
+from shapely import STRtree
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import text
-from botocore.exceptions import ClientError
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
 from utils.webdriver_pool import WebDriverPool
 from config import config
 
 logger = logging.getLogger(__name__)
 
+# True once every tile / image overlay <img> on the page has finished loading.
+TILES_READY_JS = (
+    "var t=document.querySelectorAll('img.leaflet-tile, img.leaflet-image-layer');"
+    "if(!t.length) return false;"
+    "for (var i=0;i<t.length;i++){ if(!t[i].complete) return false;}"
+    "return true;"
+)
+
+# Tree overlay pixel (R=0, G=100, B=0, A=153) packed as one little-endian uint32,
+# so the RGBA image is built with a single select instead of four channel writes.
+TREE_RGBA_U32 = np.uint32(0x99006400)
+
+# Overlay geometries are clipped in PostGIS to the parcel bbox grown by :pad degrees,
+# which is wide enough to cover the map padding and zoom rounding around the parcel.
+CLIP_BOX_SQL = "ST_Expand(ST_SetSRID(ST_GeomFromText(:wkt, 4326), 4326)::box2d, :pad)"
+
+_INTERSECTS_PARCEL = "ST_Intersects(geom, ST_SetSRID(ST_GeomFromText(:wkt, 4326), 4326))"
+
+# Overlay source -> query returning (geojson, attr) rows clipped to the map extent.
+OVERLAY_QUERIES = {
+    "road": f"""SELECT ST_AsGeoJSON(ST_ClipByBox2D(geom, {CLIP_BOX_SQL})) AS geojson, NULL::text AS attr FROM public.osm_roads WHERE ST_DWithin(geom_3083, ST_Transform(ST_SetSRID(ST_GeomFromText(:wkt), 4326), 3083), 50)""",
+    "flood": f"""SELECT ST_AsGeoJSON(ST_ClipByBox2D(ST_Transform(geom, 4326), {CLIP_BOX_SQL})) AS geojson, fld_zone::text AS attr FROM tx_fld_haz WHERE {_INTERSECTS_PARCEL}""",
+    "pipeline": f"""SELECT ST_AsGeoJSON(ST_ClipByBox2D(ST_Transform(geom, 4326), {CLIP_BOX_SQL})) AS geojson, NULL::text AS attr FROM gas_pipelines WHERE {_INTERSECTS_PARCEL}""",
+    "electric": f"""SELECT ST_AsGeoJSON(ST_ClipByBox2D(ST_Transform(geom, 4326), {CLIP_BOX_SQL})) AS geojson, NULL::text AS attr FROM electric_transmission_lines WHERE {_INTERSECTS_PARCEL}""",
+    "contour": f"""SELECT ST_AsGeoJSON(ST_ClipByBox2D(ST_Transform(shape, 4326), {CLIP_BOX_SQL})) AS geojson, contourelevation::text AS attr FROM tx_contour WHERE ST_Intersects(shape, ST_Buffer(ST_SetSRID(ST_GeomFromText(:wkt, 4326), 4326)::geography, 20)::geometry)""",
+    "radcorp_water": f"""SELECT ST_AsGeoJSON(ST_ClipByBox2D(ST_Transform(geom, 4326), {CLIP_BOX_SQL})) AS geojson, NULL::text AS attr FROM radcorp_water WHERE {_INTERSECTS_PARCEL}""",
+    "stream": f"""SELECT ST_AsGeoJSON(ST_ClipByBox2D(ST_Transform(geom, 4326), {CLIP_BOX_SQL})) AS geojson, NULL::text AS attr FROM stream WHERE {_INTERSECTS_PARCEL}""",
+}
+
+# Image folder -> overlay sources its layer is drawn from.
+LAYER_SOURCES = {
+    "road_frontage": ["road"],
+    "flood_hazard": ["flood"],
+    "contour": ["contour"],
+    "water_features": ["radcorp_water", "stream"],
+    "gas_pipelines": ["pipeline"],
+    "electric_lines": ["electric"],
+}
+
+# Tree-coverage rasters are in EPSG:3857; always_xy keeps lon/lat ordering like the rest of the module.
+TO_WEB_MERCATOR = Transformer.from_crs("EPSG:4326", "EPSG:3857", always_xy=True)
+
+SATELLITE_TILES = "https://mt1.google.com/vt/lyrs=s&x={x}&y={y}&z={z}"
+BOUNDARY_STYLE = {'color': 'red', 'weight': 3, 'fillOpacity': 0, 'opacity': 1}
+
+# Static page every map image is rendered from; only __LEGENDS__ and __PAYLOAD__ change per parcel.
+# The payload carries the view bounds, the boundary and one entry per overlay layer, and
+# showLayer(id) switches the visible overlay and legend without reloading the page.
+MAP_HTML_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<link rel="preconnect" href="https://mt1.google.com"/>
+<link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/leaflet@1.9.3/dist/leaflet.css"/>
+<script src="https://cdn.jsdelivr.net/npm/leaflet@1.9.3/dist/leaflet.js"></script>
+<style>
+    html, body, #map { width: 100%; height: 100%; margin: 0; padding: 0; }
+    .leaflet-container { opacity: 1 !important; background: none !important; }
+    .leaflet-control-container, .leaflet-control-attribution { display: none !important; }
+    .legend {
+        position: fixed; bottom: 10px; right: 10px; display: none;
+        background-color: rgba(255, 255, 255, 0.8);
+        border-radius: 5px; padding: 10px; font-size: 12px; z-index: 1000;
+    }
+</style>
+</head>
+<body>
+<div id="map"></div>
+__LEGENDS__
+<script>
+var payload = __PAYLOAD__;
+var map = L.map("map", {zoomControl: false, attributionControl: false, tap: false});
+L.tileLayer(payload.tiles, {maxZoom: 18}).addTo(map);
+map.fitBounds(payload.bounds, {padding: [payload.padding, payload.padding]});
+var layers = {};
+payload.layers.forEach(function (spec) {
+    var group = L.featureGroup();
+    if (spec.geojson) {
+        L.geoJSON(spec.geojson, {style: function (f) { return Object.assign({}, spec.style, f.properties.style); }}).addTo(group);
+    }
+    if (spec.image) {
+        L.imageOverlay(spec.image.url, spec.image.bounds, {opacity: spec.image.opacity}).addTo(group);
+    }
+    layers[spec.id] = group;
+});
+var boundary = L.geoJSON(payload.boundary, {style: payload.boundaryStyle}).addTo(map);
+function showLayer(id) {
+    Object.keys(layers).forEach(function (k) { map.removeLayer(layers[k]); });
+    if (layers[id]) { layers[id].addTo(map); }
+    boundary.bringToFront();
+    document.querySelectorAll(".legend").forEach(function (el) {
+        el.style.display = el.id === "legend-" + id ? "block" : "none";
+    });
+}
+showLayer(payload.active);
+</script>
+</body>
+</html>
+"""
+
+BOUNDARY_LEGEND = "<svg width='16' height='16' style='vertical-align:middle;margin-right:6px;'><polygon points='2,2 14,2 14,14 2,14' style='fill:none;stroke:red;stroke-width:2'/></svg> Property Boundary"
+
+def _tree_rgba(data: np.ndarray, inside: np.ndarray) -> Optional[np.ndarray]:
+    """
+    Thresholds a tree-coverage window and packs it to an RGBA overlay in place.
+    Returns None when no pixel inside the parcel is covered.
+    """
+    np.logical_and(inside, data > 1, out=inside)
+    if not inside.any():
+        return None
+    packed = np.where(inside, TREE_RGBA_U32, np.uint32(0)).astype("<u4", copy=False)
+    return packed.view(np.uint8).reshape(inside.shape[0], inside.shape[1], 4)
+
+def _reencode_png(png_bytes: bytes) -> bytes:
+    """Screenshot PNG -> palette PNG. Module-level so it can run in the PIL process pool."""
+    with Image.open(BytesIO(png_bytes)) as img:
+        # Map screenshots have few distinct colours; an 8-bit palette roughly halves the file.
+        img = img.convert("RGB").quantize(colors=256, method=Image.Quantize.FASTOCTREE)
+        buf = BytesIO()
+        img.save(buf, format="PNG", compress_level=1)
+        return buf.getvalue()
+
+# Worker processes for PNG re-encoding, shared by every ImageService instance (the routes' and
+# AnalysisService's) and shut down from the app lifespan. Spawned rather than forked, since the
+# parent already runs Selenium and executor threads.
+_pil_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_pil_pool() -> ProcessPoolExecutor:
+    global _pil_pool
+    if _pil_pool is None:
+        _pil_pool = ProcessPoolExecutor(
+            max_workers=max(1, (os.cpu_count() or 2) // 2),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pil_pool
+
+
+def shutdown_pil_pool():
+    global _pil_pool
+    if _pil_pool is not None:
+        _pil_pool.shutdown(wait=False, cancel_futures=True)
+        _pil_pool = None
+
 class ImageService:
     """
     Centralized service for generating GIS analysis images.
@@ -41,6 +190,12 @@ class ImageService:
         self.dem_path = os.environ.get("ELEVATION_FILE", "/mnt/land200/gis-data/tx_terrain/Texas_DEM.vrt")
         self.tree_path = os.environ.get("TREE_COVERAGE_PATH", "/mnt/land200/gis-data/tx_treecoverage")
         self._s3_client = None
+        # Known-present S3 keys, and GIDs whose parcels/{gid}/ prefix was listed recently.
+        self._key_cache = TTLCache(maxsize=100_000, ttl=3600)
+        self._listed_gids = TTLCache(maxsize=10_000, ttl=300)
+        # Screenshots are a few MB at most, so keep them single-PUT and let larger objects split in parallel.
+        self._transfer_config = TransferConfig(multipart_threshold=16 * 1024 * 1024, max_concurrency=10, use_threads=True)
+        self._tree_index = None
 
     @property
     def s3(self):
@@ -50,9 +205,35 @@ class ImageService:
                 region_name=self.s3_region,
                 aws_access_key_id=config.AWS_ACCESS_KEY_ID,
                 aws_secret_access_key=config.AWS_SECRET_ACCESS_KEY,
+                config=BotoConfig(
+                    max_pool_connections=64,
+                    retries={"mode": "adaptive", "max_attempts": 5},
+                    tcp_keepalive=True,
+                    signature_version="s3v4",
+                ),
             )
         return self._s3_client
 
+    @property
+    def pil_pool(self) -> ProcessPoolExecutor:
+        """Worker processes for PNG re-encoding, so it runs outside the GIL and off the driver threads."""
+        return get_pil_pool()
+
+    @property
+    def tree_index(self) -> Tuple[Optional[STRtree], List[str]]:
+        """Spatial index of tree-coverage tile footprints, built on first use."""
+        if self._tree_index is None:
+            paths, footprints = [], []
+            if os.path.exists(self.tree_path):
+                for f in sorted(os.listdir(self.tree_path)):
+                    if f.endswith(".tif"):
+                        fpath = os.path.join(self.tree_path, f)
+                        with rasterio.open(fpath) as src:
+                            footprints.append(box(*src.bounds))
+                        paths.append(fpath)
+            self._tree_index = (STRtree(footprints) if footprints else None, paths)
+        return self._tree_index
+
     def _get_s3_key(self, gid: Optional[int], folder_name: str, geom_str: Optional[str] = None) -> str:
         if gid:
             return f"parcels/{gid}/{folder_name}_{gid}.png"
@@ -61,24 +242,46 @@ class ImageService:
             return f"temp/{folder_name}/{geom_hash}.png"
         else:
             return f"temp/{folder_name}/{uuid.uuid4().hex}.png"
+
+    def _list_parcel_keys(self, gid: int) -> List[str]:
+        response = self.s3.list_objects_v2(Bucket=self.s3_bucket, Prefix=f"parcels/{gid}/")
+        return [obj["Key"] for obj in response.get("Contents", [])]
+
+    async def _get_cached_url(self, gid: int, s3_key: str) -> Optional[str]:
+        """
+        Returns the public URL if the key already exists in S3, else None.
+        One LIST of the parcel prefix warms the key cache for all of its image types.
+        """
+        if s3_key not in self._key_cache and gid not in self._listed_gids:
+            for key in await asyncio.to_thread(self._list_parcel_keys, gid):
+                self._key_cache[key] = True
+            self._listed_gids[gid] = True
+        if s3_key in self._key_cache:
+            return f"{self.s3_base_url}/{s3_key}"
+        return None
+
     async def _handle_cache_or_generate( self, session: AsyncSession,gid: Optional[int], folder_name: str, generate_func: callable, geom_input: Optional[str] = None) -> Union[str, Dict[str, Any]]:
         s3_key = self._get_s3_key(gid, folder_name, geom_input)
         if not geom_input and gid:
-            try:
-                self.s3.head_object(Bucket=self.s3_bucket, Key=s3_key)
-                return f"{self.s3_base_url}/{s3_key}"
-            except ClientError as e:
-                if e.response['Error']['Code'] != "404":
-                    raise
+            cached_url = await self._get_cached_url(gid, s3_key)
+            if cached_url:
+                return cached_url
         result = await generate_func(session, gid, geom_input)
         if isinstance(result, dict):
             return result
-        self.s3.upload_fileobj(
-            result, 
+        return await self._store_png(s3_key, result)
+
+    async def _store_png(self, s3_key: str, buf: BytesIO) -> str:
+        """Uploads a rendered PNG, records the key as present and returns its public URL."""
+        await asyncio.to_thread(
+            self.s3.upload_fileobj,
+            buf, 
             self.s3_bucket, 
             s3_key, 
-            ExtraArgs={"ContentType": "image/png"}
+            ExtraArgs={"ContentType": "image/png"},
+            Config=self._transfer_config,
         )
+        self._key_cache[s3_key] = True
         
         return f"{self.s3_base_url}/{s3_key}"
 
@@ -89,10 +292,9 @@ class ImageService:
             try:
                 input_str = geom_input.strip()
                 if input_str.startswith("{"):
-                    data = json.loads(input_str)
-                    shapely_geom = shape(data)
+                    shapely_geom = shapely.from_geojson(input_str)
                 else:
-                    shapely_geom = wkt.loads(input_str)
+                    shapely_geom = shapely.from_wkt(input_str)
             except Exception as e:
                 raise ValueError(f"Invalid geometry input: {e}")
 
@@ -102,76 +304,131 @@ class ImageService:
             row = result.fetchone()
             if not row:
                 raise ValueError(f"Parcel GID {gid} not found.")
-            shapely_geom = shape(json.loads(row[0]))
+            shapely_geom = shapely.from_geojson(row[0])
 
         else:
             raise ValueError("Either 'gid' or 'geom_input' must be provided.")
 
         return shapely_geom, shapely_geom.bounds, srid
 
-    def _create_base_map(self, bounds: List[float], padding: int = 100) -> folium.Map:
+    def _create_base_map(self, bounds: List[float], padding: int = 100) -> Dict[str, Any]:
+        """Page payload for MAP_HTML_TEMPLATE; layers, legends and the boundary are added to it."""
         minx, miny, maxx, maxy = bounds
-        center_lat = (miny + maxy) / 2
-        center_lon = (minx + maxx) / 2
-
-        m = folium.Map(
-            location=[center_lat, center_lon],
-            tiles="https://mt1.google.com/vt/lyrs=s&x={x}&y={y}&z={z}",
-            attr="Google Satellite",
-            zoom_control=False,
-            attribution_control=False,
-            no_touch=True
+        return {
+            "tiles": SATELLITE_TILES,
+            "bounds": [[miny, minx], [maxy, maxx]],
+            "padding": padding,
+            "layers": [],
+            "legends": {},
+            "boundary": None,
+            "boundaryStyle": BOUNDARY_STYLE,
+            "active": None,
+        }
+
+    def _add_legend(self, m: Dict[str, Any], items: List[str], layer_id: str):
+        m["legends"][layer_id] = items
+
+    def _add_boundary(self, m: Dict[str, Any], shapely_geom: Any):
+        m["boundary"] = mapping(shapely_geom)
+
+    def _add_layer(self, m: Dict[str, Any], layer_id: str, layer: Dict[str, Any]):
+        m["layers"].append({"id": layer_id, **layer})
+
+    def _render_html(self, m: Dict[str, Any]) -> str:
+        legends = "".join(
+            f'<div class="legend" id="legend-{layer_id}"><strong>Legend</strong><br>{"<br>".join(items)}</div>'
+            for layer_id, items in m["legends"].items()
         )
-        m.fit_bounds([[miny, minx], [maxy, maxx]], padding=(padding, padding))
-        return m
-
-    def _add_legend(self, m: folium.Map, items: List[str]):
-        legend_content = "<br>".join(items)
-        html = f"""
-        <div style="
-            position: fixed; bottom: 10px; right: 10px;
-            background-color: rgba(255, 255, 255, 0.8);
-            border-radius: 5px; padding: 10px; font-size: 12px; z-index: 1000;
-        ">
-            <strong>Legend</strong><br>
-            {legend_content}
-        </div>
-        """
-        m.get_root().html.add_child(folium.Element(html))
-        m.get_root().html.add_child(folium.Element("""
-            <style>
-                .leaflet-container { opacity: 1 !important; background: none !important; }
-                .leaflet-control-container, .leaflet-control-attribution { display: none !important; }
-            </style>
-        """))
-
-    async def _render_and_screenshot(self, m: folium.Map, gid_ref: str) -> BytesIO:
+        payload = json.dumps({k: v for k, v in m.items() if k != "legends"}).replace("</", "<\\/")
+        return MAP_HTML_TEMPLATE.replace("__LEGENDS__", legends).replace("__PAYLOAD__", payload)
+
+    @staticmethod
+    def _clip_params(shapely_geom: Any) -> Dict[str, Any]:
+        minx, miny, maxx, maxy = shapely_geom.bounds
+        return {"wkt": shapely_geom.wkt, "pad": max(maxx - minx, maxy - miny, 0.001)}
+
+    async def _fetch_overlays(self, session: AsyncSession, shapely_geom: Any, sources: List[str]) -> Dict[str, List[Tuple[str, Optional[str]]]]:
+        """Runs the overlay queries for all requested sources as one UNION ALL round-trip."""
+        overlays = {src: [] for src in sources}
+        if not sources:
+            return overlays
+        sql = text(" UNION ALL ".join(
+            f"SELECT '{src}' AS src, q.geojson, q.attr FROM ({OVERLAY_QUERIES[src]}) AS q" for src in sources
+        ))
+        result = await session.execute(sql, self._clip_params(shapely_geom))
+        for src, geojson, attr in result.fetchall():
+            overlays[src].append((geojson, attr))
+        return overlays
+
+    async def _overlay_rows(self, session: AsyncSession, shapely_geom: Any, src: str, overlays: Optional[Dict[str, List]]) -> List[Tuple[str, Optional[str]]]:
+        if overlays is None or src not in overlays:
+            overlays = await self._fetch_overlays(session, shapely_geom, [src])
+        return overlays[src]
+
+    def _feature_collection(self, rows: List[Any], properties: Optional[List[Dict]] = None) -> Dict[str, Any]:
+        """Wraps all ST_AsGeoJSON rows of a layer in a single FeatureCollection."""
+        features = [
+            {"type": "Feature", "geometry": json.loads(row[0]), "properties": properties[i] if properties else {}}
+            for i, row in enumerate(rows)
+        ]
+        return {"type": "FeatureCollection", "features": features}
+
+    async def _render_scenes(self, m: Dict[str, Any], gid_ref: str, scenes: List[Optional[str]], reencode: Optional[List[bool]] = None) -> List[BytesIO]:
         """
-        Optimized renderer:
-        1. Acquires driver from Pool (no startup cost).
-        2. Injects HTML via Base64 (no disk write).
-        3. Returns BytesIO directly (no disk read).
+        Loads the map once and takes one screenshot per scene.
+        Each scene is an optional JS snippet run against the loaded page
+        (e.g. toggling overlay layers) before its screenshot is taken.
+        Chrome's PNG is returned as-is unless the scene's reencode flag is set.
         """
         pool = WebDriverPool.get_instance()
-        html_content = m.get_root().render()
-        b64_html = base64.b64encode(html_content.encode('utf-8')).decode('utf-8')
-        data_uri = f"data:text/html;base64,{b64_html}"
+        html_content = self._render_html(m)
+
+        def _wait_for_tiles(d):
+            try:
+                WebDriverWait(d, 10, poll_frequency=0.1).until(
+                    lambda drv: drv.execute_script(TILES_READY_JS)
+                )
+            except TimeoutException:
+                logger.warning(f"Tiles still loading for {gid_ref} after 10s, capturing anyway.")
+
         async with pool.acquire() as driver:
             def _blocking_selenium_logic(d):
                 d.set_window_size(800, 600)
-                d.get(data_uri)
+                # Write the page straight into the current (blank) tab instead of navigating to a base64 data URI.
+                frame_id = d.execute_cdp_cmd("Page.getFrameTree", {})["frameTree"]["frame"]["id"]
+                d.execute_cdp_cmd("Page.setDocumentContent", {"frameId": frame_id, "html": html_content})
                 WebDriverWait(d, 5).until(
                     EC.presence_of_element_located((By.CLASS_NAME, "leaflet-container"))
                 )
-                time.sleep(3) 
-                return d.get_screenshot_as_png()
-            png_bytes = await asyncio.to_thread(_blocking_selenium_logic, driver)
-            with Image.open(BytesIO(png_bytes)) as img:
-                img = img.convert("RGB")
-                buf = BytesIO()
-                img.save(buf, format="PNG", optimize=True)
-                buf.seek(0)
-                return buf
+                _wait_for_tiles(d)
+                shots = []
+                for script in scenes:
+                    if script:
+                        d.execute_script(script)
+                        _wait_for_tiles(d)
+                    shots.append(d.get_screenshot_as_png())
+                return shots
+            png_list = await pool.run(_blocking_selenium_logic, driver)
+        loop = asyncio.get_running_loop()
+        buffers = [BytesIO(png_bytes) for png_bytes in png_list]
+        jobs = {
+            i: loop.run_in_executor(self.pil_pool, _reencode_png, png_list[i])
+            for i, flag in enumerate(reencode or []) if flag
+        }
+        for i, data in zip(jobs, await asyncio.gather(*jobs.values())):
+            buffers[i] = BytesIO(data)
+        return buffers
+
+    async def _render_and_screenshot(self, m: Dict[str, Any], gid_ref: str, reencode: bool = False) -> BytesIO:
+        """
+        Optimized renderer:
+        1. Acquires driver from Pool (no startup cost).
+        2. Injects HTML via CDP Page.setDocumentContent (no disk write, no data URI).
+        3. Returns BytesIO directly (no disk read).
+        """
+        buffers = await self._render_scenes(m, gid_ref, [None], reencode=[reencode])
+        return buffers[0]
+
     async def get_parcel_image(self, session: AsyncSession, gid: Optional[int] = None, geom: Optional[str] = None) -> Union[str, Dict]:
         return await self._handle_cache_or_generate(session, gid, "aerial", self._gen_parcel, geom)
 
@@ -195,52 +452,129 @@ class ImageService:
 
     async def get_electric_image(self, session: AsyncSession, gid: Optional[int] = None, geom: Optional[str] = None) -> Union[str, Dict]:
         return await self._handle_cache_or_generate(session, gid, "electric_lines", self._gen_electric, geom)
+
+    def _overlay_builders(self) -> Dict[str, callable]:
+        """Folder name -> overlay layer builder, for every map type except the plain aerial."""
+        return {
+            "road_frontage": self._layer_road,
+            "flood_hazard": self._layer_flood,
+            "tree_coverage": self._layer_tree,
+            "contour": self._layer_contour,
+            "water_features": self._layer_water,
+            "gas_pipelines": self._layer_pipeline,
+            "electric_lines": self._layer_electric,
+        }
+
+    async def get_all_images(self, session: AsyncSession, gid: Optional[int] = None, geom: Optional[str] = None, folders: Optional[List[str]] = None) -> Dict[str, Union[str, Dict]]:
+        """
+        Generates every map type for one parcel from a single browser page load.
+        All overlays are added to one page and toggled in turn with showLayer,
+        so the satellite tiles are fetched once instead of once per image.
+        folders limits the render to those map types (default: all of them).
+        Returns folder name -> image URL (or a no_data dict).
+        """
+        builders = self._overlay_builders()
+        if folders is None:
+            folders = ["aerial", *builders.keys()]
+        results: Dict[str, Union[str, Dict]] = {}
+        pending = []
+        for folder in folders:
+            if not geom and gid:
+                cached_url = await self._get_cached_url(gid, self._get_s3_key(gid, folder, geom))
+                if cached_url:
+                    results[folder] = cached_url
+                    continue
+            pending.append(folder)
+        if not pending:
+            return results
+
+        shapely_geom, bounds, _ = await self._get_geometry_and_bounds(session, gid, geom)
+        sources = [src for folder in pending for src in LAYER_SOURCES.get(folder, [])]
+        overlays = await self._fetch_overlays(session, shapely_geom, sources)
+        m = self._create_base_map(bounds)
+        self._add_boundary(m, shapely_geom)
+        rendered, reencode = [], []
+        for folder in pending:
+            if folder == "aerial":
+                rendered.append(folder)
+                reencode.append(False)
+                self._add_legend(m, [BOUNDARY_LEGEND], folder)
+                continue
+            layer = await builders[folder](session, shapely_geom, bounds, overlays)
+            if isinstance(layer, dict):
+                results[folder] = layer
+                continue
+            layer_spec, legend_items = layer
+            self._add_layer(m, folder, layer_spec)
+            self._add_legend(m, [BOUNDARY_LEGEND, *legend_items], folder)
+            rendered.append(folder)
+            reencode.append("image" in layer_spec)
+        if not rendered:
+            return results
+        m["active"] = rendered[0]
+        scenes = [None, *(f"showLayer({json.dumps(folder)});" for folder in rendered[1:])]
+
+        buffers = await self._render_scenes(m, str(gid) if gid else "geom", scenes, reencode=reencode)
+        urls = await asyncio.gather(*(
+            self._store_png(self._get_s3_key(gid, folder, geom), buf) for folder, buf in zip(rendered, buffers)
+        ))
+        results.update(zip(rendered, urls))
+        return results
+
+    async def _gen_overlay(self, session: AsyncSession, gid: Optional[int], geom: Optional[str], layer_builder: callable) -> Union[BytesIO, Dict]:
+        shapely_geom, bounds, _ = await self._get_geometry_and_bounds(session, gid, geom)
+        layer = await layer_builder(session, shapely_geom, bounds)
+        if isinstance(layer, dict):
+            return layer
+        layer_spec, legend_items = layer
+        m = self._create_base_map(bounds)
+        self._add_boundary(m, shapely_geom)
+        self._add_layer(m, "overlay", layer_spec)
+        self._add_legend(m, [BOUNDARY_LEGEND, *legend_items], "overlay")
+        m["active"] = "overlay"
+        # Only raster overlays (tree coverage) go through the palette re-encode.
+        return await self._render_and_screenshot(m, str(gid) if gid else "geom", reencode="image" in layer_spec)
+
     async def _gen_parcel(self, session: AsyncSession, gid: Optional[int], geom: Optional[str] = None) -> BytesIO:
         shapely_geom, bounds, _ = await self._get_geometry_and_bounds(session, gid, geom)
         m = self._create_base_map(bounds)
-        folium.GeoJson(
-            gpd.GeoDataFrame(geometry=[shapely_geom], crs="EPSG:4326"),
-            style_function=lambda x: {'color': 'red', 'weight': 3, 'fillOpacity': 0, 'opacity': 1}
-        ).add_to(m)
-        self._add_legend(m, ["<svg width='16' height='16' style='vertical-align:middle;margin-right:6px;'><polygon points='2,2 14,2 14,14 2,14' style='fill:none;stroke:red;stroke-width:2'/></svg> Property Boundary"])
+        self._add_boundary(m, shapely_geom)
+        self._add_legend(m, [BOUNDARY_LEGEND], "aerial")
+        m["active"] = "aerial"
         return await self._render_and_screenshot(m, str(gid) if gid else "geom")
-    
+
     async def _gen_road(self, session: AsyncSession, gid: Optional[int], geom: Optional[str] = None) -> Union[BytesIO, Dict]:
-        shapely_geom, bounds, _ = await self._get_geometry_and_bounds(session, gid, geom)
-        wkt_str = shapely_geom.wkt
-        sql = text("""
-            SELECT ST_AsGeoJSON(geom) 
-        FROM public.osm_roads
-        WHERE ST_DWithin(
-            geom_3083, 
-            ST_Transform(ST_SetSRID(ST_GeomFromText(:wkt), 4326), 3083), 
-            50
-        )        """)
-        result = await session.execute(sql, {"wkt": wkt_str})
-        rows = result.fetchall()
+        return await self._gen_overlay(session, gid, geom, self._layer_road)
+
+    async def _gen_flood(self, session: AsyncSession, gid: Optional[int], geom: Optional[str] = None) -> Union[BytesIO, Dict]:
+        return await self._gen_overlay(session, gid, geom, self._layer_flood)
+
+    async def _gen_pipeline(self, session: AsyncSession, gid: Optional[int], geom: Optional[str] = None) -> Union[BytesIO, Dict]:
+        return await self._gen_overlay(session, gid, geom, self._layer_pipeline)
+
+    async def _gen_electric(self, session: AsyncSession, gid: Optional[int], geom: Optional[str] = None) -> Union[BytesIO, Dict]:
+        return await self._gen_overlay(session, gid, geom, self._layer_electric)
+
+    async def _gen_tree(self, session: AsyncSession, gid: Optional[int], geom: Optional[str] = None) -> Union[BytesIO, Dict]:
+        return await self._gen_overlay(session, gid, geom, self._layer_tree)
+
+    async def _gen_contour(self, session: AsyncSession, gid: Optional[int], geom: Optional[str] = None) -> Union[BytesIO, Dict]:
+        return await self._gen_overlay(session, gid, geom, self._layer_contour)
+
+    async def _gen_water(self, session: AsyncSession, gid: Optional[int], geom: Optional[str] = None) -> Union[BytesIO, Dict]:
+        return await self._gen_overlay(session, gid, geom, self._layer_water)
+
+    async def _layer_road(self, session: AsyncSession, shapely_geom: Any, bounds: List[float], overlays: Optional[Dict[str, List]] = None) -> Union[Tuple[Dict[str, Any], List[str]], Dict]:
+        rows = await self._overlay_rows(session, shapely_geom, "road", overlays)
 
         if not rows:
             return {"message": "No road frontage detected within 50m.", "status": "no_data"}
 
-        m = self._create_base_map(bounds)
-        folium.GeoJson(gpd.GeoDataFrame(geometry=[shapely_geom], crs="EPSG:4326"), style_function=lambda x: {'color': 'red', 'weight': 3, 'fillOpacity': 0}).add_to(m)
-        
-        for row in rows:
-            road_geom = shape(json.loads(row[0]))
-            folium.GeoJson(gpd.GeoDataFrame(geometry=[road_geom], crs="EPSG:4326"), style_function=lambda x: {'color': 'green', 'weight': 3, 'opacity': 0.8}).add_to(m)
-        
-        self._add_legend(m, [
-            "<svg width='16' height='16' style='vertical-align:middle;margin-right:6px;'><polygon points='2,2 14,2 14,14 2,14' style='fill:none;stroke:red;stroke-width:2'/></svg> Property Boundary",
-            "<svg width='16' height='16' style='vertical-align:middle;margin-right:6px;'><line x1='2' y1='8' x2='14' y2='8' style='stroke:green;stroke-width:3'/></svg> Nearby Roads"
-        ])
-        return await self._render_and_screenshot(m, str(gid) if gid else "geom")
+        layer = {"geojson": self._feature_collection(rows), "style": {'color': 'green', 'weight': 3, 'opacity': 0.8}}
+        return layer, ["<svg width='16' height='16' style='vertical-align:middle;margin-right:6px;'><line x1='2' y1='8' x2='14' y2='8' style='stroke:green;stroke-width:3'/></svg> Nearby Roads"]
 
-    async def _gen_flood(self, session: AsyncSession, gid: Optional[int], geom: Optional[str] = None) -> Union[BytesIO, Dict]:
-        shapely_geom, bounds, _ = await self._get_geometry_and_bounds(session, gid, geom)
-        
-        sql = text("""SELECT ST_AsGeoJSON(ST_Transform(geom, 4326)), fld_zone FROM tx_fld_haz WHERE ST_Intersects(geom, ST_SetSRID(ST_GeomFromText(:wkt, 4326), 4326))""")
-        result = await session.execute(sql, {"wkt": shapely_geom.wkt})
-        rows = result.fetchall()
+    async def _layer_flood(self, session: AsyncSession, shapely_geom: Any, bounds: List[float], overlays: Optional[Dict[str, List]] = None) -> Union[Tuple[Dict[str, Any], List[str]], Dict]:
+        rows = await self._overlay_rows(session, shapely_geom, "flood", overlays)
         
         # Filter hazardous zones
         hazardous = [r for r in rows if r[1] not in ['AREA NOT INCLUDED', 'OPEN WATER', 'X']]
@@ -248,125 +582,82 @@ class ImageService:
         if not hazardous:
             return {"message": "No flood hazards detected on property.", "status": "no_data"}
 
-        m = self._create_base_map(bounds)
         colors = {'A': '#0000FF', 'AE': '#4169E1', 'AH': '#87CEEB', 'AO': '#00CED1', 'VE': '#1E90FF', 'X_0.2PCT': '#006400', 'X_MINIMAL': '#90EE90'}
         
-        for row in hazardous:
-            color = colors.get(row[1], '#808080')
-            folium.GeoJson(gpd.GeoDataFrame(geometry=[shape(json.loads(row[0]))], crs="EPSG:4326"), style_function=lambda x, c=color: {'color': c, 'fillColor': c, 'weight': 1, 'fillOpacity': 0.5}).add_to(m)
-        
-        folium.GeoJson(gpd.GeoDataFrame(geometry=[shapely_geom], crs="EPSG:4326"), style_function=lambda x: {'color': 'red', 'weight': 3, 'fillOpacity': 0}).add_to(m)
-        self._add_legend(m, ["<svg width='16' height='16' style='vertical-align:middle;margin-right:6px;'><polygon points='2,2 14,2 14,14 2,14' style='fill:none;stroke:red;stroke-width:2'/></svg> Property Boundary", "<svg width='16' height='16' style='vertical-align:middle;margin-right:6px;'><rect x='2' y='2' width='12' height='12' style='fill:#4169E1;stroke:#4169E1;stroke-width:2'/></svg> Flood Zones"])
-        return await self._render_and_screenshot(m, str(gid) if gid else "geom")
+        zone_styles = [{"style": {"color": c, "fillColor": c}} for c in (colors.get(row[1], '#808080') for row in hazardous)]
+        layer = {"geojson": self._feature_collection(hazardous, zone_styles), "style": {'weight': 1, 'fillOpacity': 0.5}}
+        return layer, ["<svg width='16' height='16' style='vertical-align:middle;margin-right:6px;'><rect x='2' y='2' width='12' height='12' style='fill:#4169E1;stroke:#4169E1;stroke-width:2'/></svg> Flood Zones"]
 
-    async def _gen_pipeline(self, session: AsyncSession, gid: Optional[int], geom: Optional[str] = None) -> Union[BytesIO, Dict]:
-        shapely_geom, bounds, _ = await self._get_geometry_and_bounds(session, gid, geom)
-        
-        sql = text("SELECT ST_AsGeoJSON(ST_Transform(geom, 4326)) FROM gas_pipelines WHERE ST_Intersects(geom, ST_SetSRID(ST_GeomFromText(:wkt, 4326), 4326))")
-        res = await session.execute(sql, {"wkt": shapely_geom.wkt})
-        rows = res.fetchall()
+    async def _layer_pipeline(self, session: AsyncSession, shapely_geom: Any, bounds: List[float], overlays: Optional[Dict[str, List]] = None) -> Union[Tuple[Dict[str, Any], List[str]], Dict]:
+        rows = await self._overlay_rows(session, shapely_geom, "pipeline", overlays)
 
         if not rows:
             return {"message": "No gas pipelines detected.", "status": "no_data"}
 
-        m = self._create_base_map(bounds)
-        for row in rows:
-            folium.GeoJson(gpd.GeoDataFrame(geometry=[shape(json.loads(row[0]))], crs="EPSG:4326"), style_function=lambda x: {'color': 'orange', 'weight': 3, 'dashArray': '5, 5'}).add_to(m)
-        
-        folium.GeoJson(gpd.GeoDataFrame(geometry=[shapely_geom], crs="EPSG:4326"), style_function=lambda x: {'color': 'red', 'weight': 3, 'fillOpacity': 0}).add_to(m)
-        self._add_legend(m, ["<svg width='16' height='16' style='vertical-align:middle;margin-right:6px;'><polygon points='2,2 14,2 14,14 2,14' style='fill:none;stroke:red;stroke-width:2'/></svg> Property Boundary", "<svg width='16' height='16' style='vertical-align:middle;margin-right:6px;'><line x1='2' y1='8' x2='14' y2='8' style='stroke:orange;stroke-width:3;stroke-dasharray:5,5'/></svg> Gas Pipeline"])
-        return await self._render_and_screenshot(m, str(gid) if gid else "geom")
+        layer = {"geojson": self._feature_collection(rows), "style": {'color': 'orange', 'weight': 3, 'dashArray': '5, 5'}}
+        return layer, ["<svg width='16' height='16' style='vertical-align:middle;margin-right:6px;'><line x1='2' y1='8' x2='14' y2='8' style='stroke:orange;stroke-width:3;stroke-dasharray:5,5'/></svg> Gas Pipeline"]
 
-    async def _gen_electric(self, session: AsyncSession, gid: Optional[int], geom: Optional[str] = None) -> Union[BytesIO, Dict]:
-        shapely_geom, bounds, _ = await self._get_geometry_and_bounds(session, gid, geom)
-        sql = text("SELECT ST_AsGeoJSON(ST_Transform(geom, 4326)) FROM electric_transmission_lines WHERE ST_Intersects(geom, ST_SetSRID(ST_GeomFromText(:wkt, 4326), 4326))")
-        res = await session.execute(sql, {"wkt": shapely_geom.wkt})
-        rows = res.fetchall()
+    async def _layer_electric(self, session: AsyncSession, shapely_geom: Any, bounds: List[float], overlays: Optional[Dict[str, List]] = None) -> Union[Tuple[Dict[str, Any], List[str]], Dict]:
+        rows = await self._overlay_rows(session, shapely_geom, "electric", overlays)
         if not rows:
             return {"message": "No electric transmission lines detected.", "status": "no_data"}
-        m = self._create_base_map(bounds)
-        for row in rows:
-            folium.GeoJson(gpd.GeoDataFrame(geometry=[shape(json.loads(row[0]))], crs="EPSG:4326"), style_function=lambda x: {'color': 'yellow', 'weight': 3}).add_to(m)
-        folium.GeoJson(gpd.GeoDataFrame(geometry=[shapely_geom], crs="EPSG:4326"), style_function=lambda x: {'color': 'red', 'weight': 3, 'fillOpacity': 0}).add_to(m)
-        self._add_legend(m, ["<svg width='16' height='16' style='vertical-align:middle;margin-right:6px;'><polygon points='2,2 14,2 14,14 2,14' style='fill:none;stroke:red;stroke-width:2'/></svg> Property Boundary", "<svg width='16' height='16' style='vertical-align:middle;margin-right:6px;'><line x1='2' y1='8' x2='14' y2='8' style='stroke:yellow;stroke-width:3'/></svg> Electric Line"])
-        return await self._render_and_screenshot(m, str(gid) if gid else "geom")
+        layer = {"geojson": self._feature_collection(rows), "style": {'color': 'yellow', 'weight': 3}}
+        return layer, ["<svg width='16' height='16' style='vertical-align:middle;margin-right:6px;'><line x1='2' y1='8' x2='14' y2='8' style='stroke:yellow;stroke-width:3'/></svg> Electric Line"]
     
-    async def _gen_tree(self, session: AsyncSession, gid: Optional[int], geom: Optional[str] = None) -> Union[BytesIO, Dict]:
-        shapely_geom, bounds, _ = await self._get_geometry_and_bounds(session, gid, geom)
-        has_trees = False
-        m = self._create_base_map(bounds)
-        if os.path.exists(self.tree_path):
+    async def _layer_tree(self, session: AsyncSession, shapely_geom: Any, bounds: List[float], overlays: Optional[Dict[str, List]] = None) -> Union[Tuple[Dict[str, Any], List[str]], Dict]:
+        layer = None
+        tree_tiles, tree_files = self.tree_index
+        if tree_tiles is not None:
             try:
-                gdf = gpd.GeoDataFrame(geometry=[shapely_geom], crs="EPSG:4326").to_crs(epsg=3857)
-                proj_geom = gdf.geometry[0]
+                proj_geom = shapely.transform(shapely_geom, TO_WEB_MERCATOR.transform, interleaved=False)
                 bbox = proj_geom.bounds
-                for f in os.listdir(self.tree_path):
-                    if f.endswith(".tif"):
-                        fpath = os.path.join(self.tree_path, f)
-                        with rasterio.open(fpath) as src:
-                            if not (src.bounds.right < bbox[0] or src.bounds.left > bbox[2] or src.bounds.bottom > bbox[3] or src.bounds.top < bbox[1]):
-                                try:
-                                    out_image, _ = mask(src, [mapping(proj_geom)], crop=True, nodata=0)
-                                    if np.any(out_image[0] > 1):
-                                        has_trees = True
-                                        data = out_image[0]
-                                        mask_arr = data > 1
-                                        rgba = np.zeros((mask_arr.shape[0], mask_arr.shape[1], 4), dtype=np.uint8)
-                                        rgba[mask_arr] = [0, 100, 0, 153]
-                                        img_buf = BytesIO()
-                                        Image.fromarray(rgba).save(img_buf, format='PNG')
-                                        img_b64 = base64.b64encode(img_buf.getvalue()).decode('utf-8')
-                                        img_uri = f"data:image/png;base64,{img_b64}"
-
-                                        folium.raster_layers.ImageOverlay(
-                                            img_uri, 
-                                            bounds=[[bounds[1], bounds[0]], [bounds[3], bounds[2]]], 
-                                            opacity=0.6
-                                        ).add_to(m)
-                                        break
-                                except: continue
+                for i in sorted(tree_tiles.query(box(*bbox))):
+                    fpath = tree_files[i]
+                    with rasterio.Env(GDAL_CACHEMAX=512), rasterio.open(fpath) as src:
+                        try:
+                            # Read only the parcel's window instead of masking the whole tile.
+                            win = from_bounds(*bbox, transform=src.transform).round_offsets().round_lengths()
+                            data = src.read(1, window=win, boundless=True, fill_value=0)
+                            inside = geometry_mask([mapping(proj_geom)], out_shape=data.shape, transform=src.window_transform(win), invert=True)
+                            rgba = _tree_rgba(data, inside)
+                            if rgba is not None:
+                                img_buf = BytesIO()
+                                Image.fromarray(rgba).save(img_buf, format='PNG')
+                                img_b64 = base64.b64encode(img_buf.getvalue()).decode('utf-8')
+                                img_uri = f"data:image/png;base64,{img_b64}"
+
+                                layer = {"image": {
+                                    "url": img_uri,
+                                    "bounds": [[bounds[1], bounds[0]], [bounds[3], bounds[2]]],
+                                    "opacity": 0.6,
+                                }}
+                                break
+                        except: continue
             except Exception: pass
 
-        if not has_trees:
+        if layer is None:
             return {"message": "No significant tree coverage detected.", "status": "no_data"}
+        return layer, ["<svg width='16' height='16' style='vertical-align:middle;margin-right:6px;'><rect x='2' y='2' width='12' height='12' style='fill:#006400;stroke:#006400;stroke-width:2'/></svg> Tree Coverage"]
 
-        folium.GeoJson(gpd.GeoDataFrame(geometry=[shapely_geom], crs="EPSG:4326"), style_function=lambda x: {'color': 'red', 'weight': 3, 'fillOpacity': 0}).add_to(m)
-        self._add_legend(m, ["<svg width='16' height='16' style='vertical-align:middle;margin-right:6px;'><polygon points='2,2 14,2 14,14 2,14' style='fill:none;stroke:red;stroke-width:2'/></svg> Property Boundary", "<svg width='16' height='16' style='vertical-align:middle;margin-right:6px;'><rect x='2' y='2' width='12' height='12' style='fill:#006400;stroke:#006400;stroke-width:2'/></svg> Tree Coverage"])
-        return await self._render_and_screenshot(m, str(gid) if gid else "geom")
-
-    async def _gen_contour(self, session: AsyncSession, gid: Optional[int], geom: Optional[str] = None) -> Union[BytesIO, Dict]:
-        shapely_geom, bounds, _ = await self._get_geometry_and_bounds(session, gid, geom)
-        sql = text("""SELECT ST_AsGeoJSON(ST_Transform(shape, 4326)), contourelevation FROM tx_contour WHERE ST_Intersects(shape, ST_Buffer(ST_SetSRID(ST_GeomFromText(:wkt, 4326), 4326)::geography, 20)::geometry)""")
-        result = await session.execute(sql, {"wkt": shapely_geom.wkt})
-        rows = result.fetchall()
+    async def _layer_contour(self, session: AsyncSession, shapely_geom: Any, bounds: List[float], overlays: Optional[Dict[str, List]] = None) -> Union[Tuple[Dict[str, Any], List[str]], Dict]:
+        rows = await self._overlay_rows(session, shapely_geom, "contour", overlays)
         
         if not rows:
             return {"message": "No contour lines detected.", "status": "no_data"}
 
-        m = self._create_base_map(bounds)
-        for row in rows:
-            c_geom = shape(json.loads(row[0]))
-            folium.GeoJson(gpd.GeoDataFrame(geometry=[c_geom], crs="EPSG:4326"), style_function=lambda x: {'color': '#8B4513', 'weight': 2}).add_to(m)
-        
-        folium.GeoJson(gpd.GeoDataFrame(geometry=[shapely_geom], crs="EPSG:4326"), style_function=lambda x: {'color': 'red', 'weight': 3, 'fillOpacity': 0}).add_to(m)
-        self._add_legend(m, ["<svg width='16' height='16' style='vertical-align:middle;margin-right:6px;'><polygon points='2,2 14,2 14,14 2,14' style='fill:none;stroke:red;stroke-width:2'/></svg> Property Boundary", "<span style='display:inline-block;width:15px;height:0;border-top:3px solid #8B4513;vertical-align:middle;margin-right:6px;'></span> Contour Line"])
-        return await self._render_and_screenshot(m, str(gid) if gid else "geom")
+        layer = {"geojson": self._feature_collection(rows), "style": {'color': '#8B4513', 'weight': 2}}
+        return layer, ["<span style='display:inline-block;width:15px;height:0;border-top:3px solid #8B4513;vertical-align:middle;margin-right:6px;'></span> Contour Line"]
 
-    async def _gen_water(self, session: AsyncSession, gid: Optional[int], geom: Optional[str] = None) -> Union[BytesIO, Dict]:
-        shapely_geom, bounds, _ = await self._get_geometry_and_bounds(session, gid, geom)
-        has_water = False
-        m = self._create_base_map(bounds)
+    async def _layer_water(self, session: AsyncSession, shapely_geom: Any, bounds: List[float], overlays: Optional[Dict[str, List]] = None) -> Union[Tuple[Dict[str, Any], List[str]], Dict]:
+        water_rows, water_styles = [], []
         
+        if overlays is None:
+            overlays = await self._fetch_overlays(session, shapely_geom, LAYER_SOURCES["water_features"])
         for tbl, style in {"radcorp_water": {"c": "blue", "l": "Pond/Lake"}, "stream": {"c": "cyan", "l": "Stream"}}.items():
-            sql = text(f"SELECT ST_AsGeoJSON(ST_Transform(geom, 4326)) FROM {tbl} WHERE ST_Intersects(geom, ST_SetSRID(ST_GeomFromText(:wkt, 4326), 4326))")
-            res = await session.execute(sql, {"wkt": shapely_geom.wkt})
-            rows = res.fetchall()
-            if rows:
-                has_water = True
-                for row in rows:
-                    folium.GeoJson(gpd.GeoDataFrame(geometry=[shape(json.loads(row[0]))], crs="EPSG:4326"), style_function=lambda x, c=style['c']: {'color': c, 'fillColor': c, 'fillOpacity': 0.5, 'weight': 2}).add_to(m)
-        if not has_water:
+            rows = await self._overlay_rows(session, shapely_geom, tbl, overlays)
+            water_rows.extend(rows)
+            water_styles.extend({"style": {"color": style['c'], "fillColor": style['c']}} for _ in rows)
+        if not water_rows:
             return {"message": "No water features detected.", "status": "no_data"}
-        folium.GeoJson(gpd.GeoDataFrame(geometry=[shapely_geom], crs="EPSG:4326"), style_function=lambda x: {'color': 'red', 'weight': 3, 'fillOpacity': 0}).add_to(m)
-        self._add_legend(m, ["<svg width='16' height='16' style='vertical-align:middle;margin-right:6px;'><polygon points='2,2 14,2 14,14 2,14' style='fill:none;stroke:red;stroke-width:2'/></svg> Property Boundary", "<span style='color:blue;'>■</span> Water Features"])
-        return await self._render_and_screenshot(m, str(gid) if gid else "geom")
\ No newline at end of file
+        layer = {"geojson": self._feature_collection(water_rows, water_styles), "style": {'fillOpacity': 0.5, 'weight': 2}}
+        return layer, ["<span style='color:blue;'>■</span> Water Features"]
@@ -1,20 +1,22 @@
 from typing import Optional, List
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, or_
-from geoalchemy2.shape import from_shape
+from sqlalchemy import Integer, column, select, func, or_, values
 from geoalchemy2.functions import ST_Contains
-from shapely.geometry import Point
 import logging
 from fastapi import HTTPException
 from sqlalchemy.orm import aliased
 from schemas import Parcel
 from models import ParcelResponse
-from config import config
 logger = logging.getLogger(__name__)
 
+# Everything ParcelResponse reads; geom is left out so list searches skip WKB transfer and parsing.
+PARCEL_RESPONSE_COLUMNS = (
+    Parcel.gid, Parcel.prop_id, Parcel.geo_id, Parcel.county,
+    Parcel.owner_name, Parcel.legal_area, Parcel.situs_addr,
+)
 
 class ParcelSearch:
-    async def get_by_filters(self, db: AsyncSession, prop_id: Optional[str] = None, county: Optional[str] = None) -> List[ParcelResponse]:
+    async def get_by_filters(self, db: AsyncSession, prop_id: Optional[str] = None, county: Optional[str] = None, limit: int = 100, offset: int = 0) -> List[ParcelResponse]:
         """
         Fetch parcels based on prop_id (or geo_id) and county.
 
@@ -22,6 +24,8 @@ class ParcelSearch:
             db: Database session
             prop_id: Property ID or geo ID to search for
             county: County name to filter by
+            limit: Maximum number of parcels to return
+            offset: Number of parcels to skip (for paging through large counties)
 
         Returns:
             List of matching parcels
@@ -38,7 +42,7 @@ class ParcelSearch:
                 raise HTTPException(
                     status_code=400, detail="At least one search parameter (prop_id or county) is required")
 
-            query = select(Parcel)
+            query = select(*PARCEL_RESPONSE_COLUMNS)
 
             if prop_id:
                 query = query.filter(
@@ -47,22 +51,18 @@ class ParcelSearch:
 
             if county:
                 query = query.filter(func.lower(
-                    Parcel.county) == func.lower(county))
+                    Parcel.county) == county.strip().lower())
                 logger.debug(f"Added county filter: {county}")
 
+            # A bare county filter can match hundreds of thousands of rows; page through them by gid.
+            query = query.order_by(Parcel.gid).limit(limit).offset(offset)
             result = await db.execute(query)
-            parcels = result.scalars().all()
+            parcels = result.mappings().all()
 
             logger.info(
                 f"Filter search completed. Found {len(parcels)} parcels")
-            responses = []
-            for parcel in parcels:
-                parcel_dict = parcel.__dict__.copy() if hasattr(parcel, '__dict__') else dict(parcel)
-                # Ensure legal_area is included as acreage
-                parcel_dict['acreage'] = parcel.legal_area if hasattr(parcel, 'legal_area') else None
-                parcel_dict['image_url'] = f"{config.IMG_URL}{parcel.gid}/aerial_{parcel.gid}.png"
-                responses.append(ParcelResponse.model_validate(parcel_dict))
-            return responses
+            # acreage (from legal_area) and image_url are derived by ParcelResponse itself.
+            return [ParcelResponse.model_validate(parcel) for parcel in parcels]
 
         except Exception as e:
             logger.error(f"Error in get_by_filters: {str(e)}", exc_info=True)
@@ -97,22 +97,18 @@ class ParcelSearch:
                     detail="Invalid coordinates. Latitude must be between -90 and 90, longitude between -180 and 180"
                 )
 
-            point = from_shape(Point(longitude, latitude), srid=4326)
-            logger.debug(f"Created point geometry: {point}")
+            # Built server-side from two float params; no shapely/WKB round trip.
+            point = func.ST_SetSRID(func.ST_MakePoint(longitude, latitude), 4326)
 
-            query = select(Parcel).where(
+            query = select(*PARCEL_RESPONSE_COLUMNS).where(
                 ST_Contains(Parcel.geom, point)).limit(100)
             result = await db.execute(query)
-            parcels = result.scalars().all()
+            parcels = result.mappings().all()
 
             logger.info(
                 f"Coordinate search completed. Found {len(parcels)} parcels")
-            responses = []
-            for parcel in parcels:
-                parcel_dict = parcel.__dict__.copy() if hasattr(parcel, '__dict__') else dict(parcel)
-                parcel_dict['image_url'] = f"{config.IMG_URL}{parcel.gid}/aerial_{parcel.gid}.png"
-                responses.append(ParcelResponse.model_validate(parcel_dict))
-            return responses
+            # acreage (from legal_area) and image_url are derived by ParcelResponse itself.
+            return [ParcelResponse.model_validate(parcel) for parcel in parcels]
 
         except Exception as e:
             logger.error(
@@ -146,29 +142,24 @@ class ParcelSearch:
                     detail="Owner name must be at least 2 characters long"
                 )
 
-            query = select(Parcel).where(func.lower(
-                Parcel.owner_name).like(f"%{owner_name.lower()}%"))
+            # Matches the lower(owner_name) gin_trgm_ops index, so the leading wildcard is index-backed.
+            query = select(*PARCEL_RESPONSE_COLUMNS).where(func.lower(
+                Parcel.owner_name).like(f"%{owner_name.strip().lower()}%"))
             logger.debug(f"Initial query with owner name filter: {owner_name}")
 
             if county:
                 query = query.where(func.lower(
-                    Parcel.county) == func.lower(county))
+                    Parcel.county) == county.strip().lower())
                 logger.debug(f"Added county filter: {county}")
 
             query = query.limit(100)
             result = await db.execute(query)
-            parcels = result.scalars().all()
+            parcels = result.mappings().all()
 
             logger.info(
                 f"Owner name search completed. Found {len(parcels)} parcels")
-            responses = []
-            for parcel in parcels:
-                parcel_dict = parcel.__dict__.copy() if hasattr(parcel, '__dict__') else dict(parcel)
-                # Use legal_area for acreage, matching prop_id/county search
-                parcel_dict['acreage'] = parcel.legal_area if hasattr(parcel, 'legal_area') else None
-                parcel_dict['image_url'] = f"{config.IMG_URL}{parcel.gid}/aerial_{parcel.gid}.png"
-                responses.append(ParcelResponse.model_validate(parcel_dict))
-            return responses
+            # acreage (from legal_area) and image_url are derived by ParcelResponse itself.
+            return [ParcelResponse.model_validate(parcel) for parcel in parcels]
 
         except Exception as e:
             logger.error(
@@ -177,19 +168,29 @@ class ParcelSearch:
                 status_code=500, detail=f"Error searching parcels by owner name: {str(e)}")
 
     async def check_adjacency(self, db: AsyncSession, gids: List[int]) -> dict:
-        if not gids or len(gids) < 2:
+        # Checked after de-duplication: the VALUES lists below need at least two distinct rows
+        # to form a pair (and an empty VALUES list is a SQL error).
+        unique_gids = set(gids or [])
+        if len(unique_gids) < 2:
             raise HTTPException(
-                status_code=400, detail="At least two GIDs are required")
+                status_code=400, detail="At least two distinct GIDs are required")
 
         try:
             Parcel1 = aliased(Parcel)
             Parcel2 = aliased(Parcel)
-
-            query = select(Parcel1.gid, Parcel2.gid).where(
-                Parcel1.gid < Parcel2.gid,
-                Parcel1.gid.in_(gids),
-                Parcel2.gid.in_(gids),
-                func.ST_Touches(Parcel1.geom, Parcel2.geom)
+            # Drive the join from the requested gids as VALUES lists, so only |gids|^2 pairs are
+            # considered instead of self-joining parcels under two IN filters.
+            rows = [(gid,) for gid in unique_gids]
+            gids1 = values(column("gid", Integer), name="g1").data(rows)
+            gids2 = values(column("gid", Integer), name="g2").data(rows)
+
+            query = (
+                select(Parcel1.gid, Parcel2.gid)
+                .select_from(gids1)
+                .join(gids2, gids1.c.gid < gids2.c.gid)
+                .join(Parcel1, Parcel1.gid == gids1.c.gid)
+                .join(Parcel2, Parcel2.gid == gids2.c.gid)
+                .where(func.ST_Touches(Parcel1.geom, Parcel2.geom))
             )
 
             result = await db.execute(query)
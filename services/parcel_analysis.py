@@ -2,20 +2,23 @@ import os
 import asyncio
 import logging
 import time
+from functools import lru_cache
 from logging.handlers import RotatingFileHandler
 from typing import Any, Dict, Literal, Optional,  Tuple, Callable
-from decimal import Decimal
+from cachetools import TTLCache
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import text
-from sqlalchemy import select
+from sqlalchemy.sql.elements import TextClause
+from sqlalchemy import func, literal_column, null, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import SQLAlchemyError
-from geoalchemy2.shape import from_shape
 from geoalchemy2.functions import ST_Contains
-from shapely.geometry import Point
 from schemas import Parcel
 from config import config
-from db import SessionLocal
+from db import SessionLocal, schema_has
 from schemas import AnalysisResult
+from utils.spatial_sql import fetch_query_parts
+from . import gis, water
 from .gis import GISAnalysisService
 from .water import WaterAnalysisService
 from .image import ImageService
@@ -33,6 +36,59 @@ analysis_handler.setFormatter(formatter)
 analysis_logger.addHandler(analysis_handler)
 analysis_logger.propagate = False
 
+# Stored columns added by migrate_db.py -> the expression they store, used instead until the
+# migration has run. A missing city_name falls through to the spatial lookup in the COALESCE.
+_PARCEL_DERIVED_COLUMNS = {
+    "acreage_computed": "ROUND((ST_Area(ST_Transform(p.geom, 3083)) / 4046.86)::numeric, 2)",
+    "city_name": "NULL",
+    "centroid": "ST_Centroid(p.geom)",
+    "geom_simplified": "ST_SimplifyPreserveTopology(p.geom, 0.00001)",
+}
+
+_PARCEL_DATA_SQL = """
+    SELECT 
+        p.prop_id,
+        p.county,
+        CASE 
+            WHEN p.legal_area IS NULL OR TRIM(p.legal_area) = '' 
+            THEN {acreage_computed}::float8
+            ELSE CAST(NULLIF(REGEXP_REPLACE(p.legal_area, '[^0-9.]', '', 'g'), '') AS FLOAT)
+        END AS acreage,
+        p.geo_id,
+        p.owner_name,
+        p.situs_addr,
+        COALESCE(
+            {city_name},
+            (SELECT c."CITY_NM" FROM texas_cities c WHERE ST_Within(p.geom, c.geometry) LIMIT 1),
+            'Outside'
+        ) AS city,
+        ST_X({centroid}) AS centroid_x,
+        ST_Y({centroid}) AS centroid_y,
+        ST_AsText({geom_simplified}) AS geom,
+        ST_AsEWKB({geom_simplified}) AS geom_ewkb
+    FROM parcels p 
+    WHERE p.gid = :gid
+"""
+
+
+@lru_cache(maxsize=None)
+def _parcel_data_query(stored_columns: frozenset) -> TextClause:
+    """
+    Built once per schema layout so every call sends the identical statement and hits asyncpg's
+    per-connection prepared-statement cache.
+    """
+    return text(_PARCEL_DATA_SQL.format(**{
+        column: f"p.{column}" if column in stored_columns else expr
+        for column, expr in _PARCEL_DERIVED_COLUMNS.items()
+    }))
+
+
+async def resolve_parcel_data_query(session: AsyncSession) -> TextClause:
+    """PARCEL_DATA query for the current schema: stored columns where migrated, computed otherwise."""
+    stored = frozenset([column for column in _PARCEL_DERIVED_COLUMNS if await schema_has(session, "parcels", column)])
+    return _parcel_data_query(stored)
+
+
 class AnalysisService:
     def __init__(self):
         try:
@@ -41,6 +97,35 @@ class AnalysisService:
             self.water_service = WaterAnalysisService()
             self.image_service = ImageService()
             self.semaphore = asyncio.Semaphore(20)
+            # Keyed on gid. Both are dropped in _save_results; the TTL bounds staleness from
+            # writes made elsewhere (catalogue upserts/deletes).
+            self._parcel_cache = TTLCache(maxsize=10_000, ttl=300)
+            self._result_cache = TTLCache(maxsize=10_000, ttl=300)
+            # result key -> (labeled queries, summarizer); executed together as one statement.
+            self._fused_analyses = {
+                "gas_lines": (gis.GAS_PIPELINES_QUERIES, self.gis_service.summarize_gas_pipelines),
+                "electric_lines": (gis.ELECTRIC_LINES_QUERIES, self.gis_service.summarize_electric_lines),
+                "road_analysis": (gis.ROAD_FRONTAGE_QUERIES, self.gis_service.summarize_road_frontage),
+                "buildable_area": (gis.BUILDABLE_AREA_QUERIES, self.gis_service.summarize_buildable_area),
+                "well_analysis": (water.WATER_WELLS_QUERIES, self.water_service.summarize_water_wells),
+                "wetland_analysis": (water.WETLANDS_QUERIES, self.water_service.summarize_wetlands),
+                "pond_analysis": (water.PONDS_QUERIES, self.water_service.summarize_ponds),
+                "lake_analysis": (water.LAKES_QUERIES, self.water_service.summarize_lakes),
+                "stream_intersection": (water.STREAMS_QUERIES, self.water_service.summarize_streams),
+                "flood_hazard": (water.FLOOD_HAZARD_QUERIES, self.water_service.summarize_flood_hazard),
+                "sea_ocean_length": (water.SEA_OCEAN_QUERIES, self.water_service.summarize_sea_ocean),
+                "shoreline_analysis": (water.SHORELINE_QUERIES, self.water_service.summarize_shoreline),
+            }
+            self._fused_parts = {
+                f"{key}.{name}": sql
+                for key, (queries, _) in self._fused_analyses.items()
+                for name, sql in queries.items()
+            }
+            # Until the wetlands_subdiv migration has run, wetlands are read from the base table.
+            self._fused_parts_base = {
+                **self._fused_parts,
+                **{f"wetland_analysis.{name}": sql for name, sql in water.WETLANDS_BASE_QUERIES.items()},
+            }
             analysis_logger.info("AnalysisService initialized successfully")
         except Exception as e:
             analysis_logger.error(f"Failed to initialize AnalysisService: {str(e)}")
@@ -49,60 +134,89 @@ class AnalysisService:
         """Fetches metadata and simplified geometry for analysis."""
         if not gid:
             raise ValueError("GID parameter is required")
+        cached = self._parcel_cache.get(gid)
+        if cached is not None:
+            return dict(cached)
         try:
-            query = text("""
-                SELECT 
-                    p.prop_id,
-                    p.county,
-                    CASE 
-                        WHEN p.legal_area IS NULL OR TRIM(p.legal_area) = '' 
-                        THEN ROUND((ST_Area(ST_Transform(p.geom, 3083)) / 4046.86)::numeric, 2)
-                        ELSE CAST(NULLIF(REGEXP_REPLACE(p.legal_area, '[^0-9.]', '', 'g'), '') AS FLOAT)
-                    END AS acreage,
-                    p.geo_id,
-                    p.owner_name,
-                    p.situs_addr,
-                    COALESCE(c."CITY_NM", 'Outside') AS city,
-                    ST_X(ST_Centroid(p.geom)) AS centroid_x,
-                    ST_Y(ST_Centroid(p.geom)) AS centroid_y,
-                    ST_AsText(ST_SimplifyPreserveTopology(p.geom, 0.00001)) AS geom
-                FROM parcels p 
-                LEFT JOIN texas_cities c 
-                    ON ST_Within(p.geom, c.geometry)
-                WHERE p.gid = :gid
-            """)
-            result = await session.execute(query, {"gid": gid})
+            result = await session.execute(await resolve_parcel_data_query(session), {"gid": gid})
             parcel_data = result.mappings().first()
             if not parcel_data:
                 return {}
+            self._parcel_cache[gid] = dict(parcel_data)
             return dict(parcel_data)
         except Exception as e:
             analysis_logger.error(f"Error fetching parcel data for GID {gid}: {e}")
             raise SQLAlchemyError(f"Failed to fetch parcel data for GID {gid}") from e
+    async def _get_existing_result(self, gid: int, session: AsyncSession) -> Optional[Dict]:
+        """Returns the stored result_data for a gid, or None if it has not been analyzed."""
+        cached = self._result_cache.get(gid)
+        if cached is not None:
+            return dict(cached)
+        stmt = select(AnalysisResult.result_data).where(AnalysisResult.parcel_gid == gid).limit(1)
+        data = (await session.execute(stmt)).scalar_one_or_none()
+        if data is not None:
+            self._result_cache[gid] = dict(data)
+        return data
     async def get_gid_by_coordinates(self, latitude: float, longitude: float, session: AsyncSession) -> Optional[int]:
         try:
             lat, lon = float(latitude), float(longitude)
             if not (-90 <= lat <= 90) or not (-180 <= lon <= 180):
                 raise ValueError("Invalid coordinates")
-            query = select(Parcel).where(
-                ST_Contains(Parcel.geom, from_shape(Point(lon, lat), srid=4326))
+            query = select(Parcel.gid).where(
+                ST_Contains(Parcel.geom, func.ST_SetSRID(func.ST_MakePoint(lon, lat), 4326))
             ).limit(1)
             result = await asyncio.wait_for(session.execute(query), timeout=10.0)
-            parcel = result.scalars().first()
-            return parcel.gid if parcel else None
+            return result.scalars().first()
         except Exception as e:
             analysis_logger.error(f"Coordinate lookup failed: {e}")
             raise
-    async def _safe_run(self, key: str, coro) -> Tuple[str, Any]:
-        try:
-            return key, await coro
-        except Exception as e:
-            analysis_logger.error(f"Task '{key}' failed: {e}")
-            return key, {"error": str(e), "status": "failed"}
-    async def _exec_with_session(self, func: Callable, **kwargs) -> Any:
+    async def _exec_with_session(self, func: Callable, session: Optional[AsyncSession] = None, **kwargs) -> Any:
+        if session is not None:
+            return await func(session, **kwargs)
         async with self.semaphore:
             async with SessionLocal() as session:
                 return await func(session, **kwargs)
+    async def _run_on_shared_session(self, tasks: Dict[str, Callable], **kwargs) -> list:
+        """
+        Runs DB-bound analyses one after another on a single session (one pool checkout).
+        An AsyncSession cannot run statements concurrently, so these are sequential; each
+        runs in a savepoint so one failing query does not abort the others.
+        """
+        results = []
+        async with self.semaphore:
+            async with SessionLocal() as session:
+                for key, func in tasks.items():
+                    try:
+                        async with session.begin_nested():
+                            results.append((key, await self._exec_with_session(func, session=session, **kwargs)))
+                    except Exception as e:
+                        # begin_nested() has already rolled back this task's savepoint; the
+                        # outer transaction (and the other tasks' work) is left intact.
+                        analysis_logger.error(f"Task '{key}' failed: {e}")
+                        results.append((key, {"error": str(e), "status": "failed"}))
+        return results
+    async def _run_fused_analyses(self, ewkb: bytes, wkt: str, fallback: Dict[str, Callable]) -> list:
+        """
+        Runs every vector/water analysis as labeled subqueries of a single statement and
+        summarizes each in Python. If the fused statement fails, falls back to running the
+        analyses one by one so a single bad table does not fail the rest.
+        """
+        try:
+            async with self.semaphore:
+                async with SessionLocal() as session:
+                    parts = self._fused_parts if await schema_has(session, "wetlands_subdiv") else self._fused_parts_base
+                    data = await fetch_query_parts(session, parts, {"ewkb": ewkb})
+        except Exception as e:
+            analysis_logger.error(f"Fused analysis query failed, running analyses individually: {e}")
+            return await self._run_on_shared_session(fallback, gid=None, geom=wkt)
+        results = []
+        for key, (queries, summarize) in self._fused_analyses.items():
+            try:
+                results.append((key, summarize({name: data[f"{key}.{name}"] for name in queries})))
+            except Exception as e:
+                analysis_logger.error(f"Task '{key}' failed: {e}")
+                results.append((key, {"error": str(e), "status": "failed"}))
+        return results
     async def _save_results(
         self, 
         session: AsyncSession, 
@@ -117,32 +231,37 @@ class AnalysisService:
         csv_context is saved to a separate JSONB column (csv_source_data) if provided.
         """
         try:
-            stmt = select(AnalysisResult).where(AnalysisResult.parcel_gid == gid)
-            result = await session.execute(stmt)
-            existing_record = result.scalars().first()
-            if existing_record:
-                existing_record.result_data = data
-                existing_record.batch_id = batch_id
-                existing_record.processing_mode = mode
-                if csv_context:
-                    existing_record.csv_source_data = csv_context
-                
-                session.add(existing_record)
-                analysis_logger.info(f"Updated analysis record for GID {gid}")
-            else:
-                new_record = AnalysisResult(
-                    parcel_gid=gid,
-                    result_data=data,
-                    batch_id=batch_id,
-                    processing_mode=mode,
-                    csv_source_data=csv_context 
-                )
-                session.add(new_record)
+            stmt = pg_insert(AnalysisResult).values(
+                parcel_gid=gid,
+                result_data=data,
+                batch_id=batch_id,
+                processing_mode=mode,
+                csv_source_data=csv_context or null(),
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[AnalysisResult.parcel_gid],
+                set_={
+                    "result_data": stmt.excluded.result_data,
+                    "batch_id": stmt.excluded.batch_id,
+                    "processing_mode": stmt.excluded.processing_mode,
+                    # Keep the stored CSV row when this run has none.
+                    "csv_source_data": func.coalesce(stmt.excluded.csv_source_data, AnalysisResult.csv_source_data),
+                    # onupdate is not applied to ON CONFLICT updates.
+                    "updated_at": func.now(),
+                },
+            ).returning(literal_column("xmax = 0").label("inserted"))
+            inserted = (await session.execute(stmt)).scalar_one()
+            if inserted:
                 analysis_logger.info(f"Created new analysis record for GID {gid}")
+            else:
+                analysis_logger.info(f"Updated analysis record for GID {gid}")
             await session.commit()
         except Exception as e:
             analysis_logger.error(f"Failed to save analysis to DB for GID {gid}: {e}")
             await session.rollback()
+        finally:
+            self._result_cache.pop(gid, None)
+            self._parcel_cache.pop(gid, None)
     async def get_analysis(
         self, 
         gid: int, 
@@ -151,38 +270,44 @@ class AnalysisService:
         batch_id: Optional[str] = None, 
         generate_images: bool = True,
         force_refresh: bool = False,       
-        csv_context: Optional[Dict] = None 
+        csv_context: Optional[Dict] = None,
+        force_refresh_analysis: bool = False,
+        force_refresh_images: bool = False,
     ) -> Dict[str, Any]:
+        """
+        force_refresh reruns everything. force_refresh_analysis reruns the GIS/water analyses but
+        reuses stored image URLs; force_refresh_images reruns everything including images.
+        """
         start_time = time.perf_counter()
         analysis_logger.info(f"Starting analysis for GID: {gid} | Mode: {processing_mode}")
+        refresh_analysis = force_refresh or force_refresh_analysis
+        refresh_images = force_refresh or force_refresh_images
         try:
-            if not force_refresh:
-                stmt = select(AnalysisResult).where(AnalysisResult.parcel_gid == gid)
-                result = await db.execute(stmt)
-                existing = result.scalars().first()
-                if existing:
-                    analysis_logger.info(f"Found existing analysis for GID {gid}. Skipping GIS.")
-                    data = existing.result_data
-                    if processing_mode == "batch":
-                        existing.batch_id = batch_id
-                        existing.processing_mode = "batch"
-                        existing.result_data = data
-                        if csv_context:
-                            existing.csv_source_data = csv_context
-                        db.add(existing)
-                        await db.commit()
-                    return data
+            existing = None
+            if not refresh_images:
+                existing = await self._get_existing_result(gid, db)
+            if existing is not None and not refresh_analysis:
+                analysis_logger.info(f"Found existing analysis for GID {gid}. Skipping GIS.")
+                if processing_mode == "batch":
+                    values = {"batch_id": batch_id, "processing_mode": "batch"}
+                    if csv_context:
+                        values["csv_source_data"] = csv_context
+                    await db.execute(
+                        update(AnalysisResult).where(AnalysisResult.parcel_gid == gid).values(**values)
+                    )
+                    await db.commit()
+                return existing
             parcel_data = await self.__get_parcel_data(gid, db)
             if not parcel_data:
                 return {"error": f"No parcel found with GID: {gid}"}
             parcel_geom_wkt = parcel_data.get("geom")
+            # Bound as-is by the fused analyses; not part of the stored result.
+            parcel_geom_ewkb = parcel_data.pop("geom_ewkb")
             analysis_tasks_map = {
                 "gas_lines": self.gis_service.analyze_gas_pipelines,
                 "electric_lines": self.gis_service.analyze_electric_lines,
                 "road_analysis": self.gis_service.analyze_road_frontage,
                 "buildable_area": self.gis_service.analyze_buildable_area,
-                "elevation_change": self.gis_service.analyze_elevation_change,
-                "tree_coverage": self.gis_service.analyze_tree_coverage,
                 "well_analysis": self.water_service.analyze_water_wells,
                 "wetland_analysis": self.water_service.analyze_wetlands,
                 "pond_analysis": self.water_service.analyze_ponds,
@@ -192,39 +317,64 @@ class AnalysisService:
                 "sea_ocean_length": self.water_service.analyze_sea_ocean,
                 "shoreline_analysis": self.water_service.analyze_shoreline,
             }
-            image_tasks_map = {}
+            # Raster-only; with geom supplied these never query, so their session never checks out a connection.
+            raster_tasks_map = {
+                "elevation_change": self.gis_service.analyze_elevation_change,
+                "tree_coverage": self.gis_service.analyze_tree_coverage,
+            }
+            # Result key -> image folder; the missing ones are rendered from one page load.
+            image_folders = {}
             if generate_images:
-                image_tasks_map = {
-                    "image_url": self.image_service.get_parcel_image,
-                    "road_frontage_image_url": self.image_service.get_road_frontage_image,
-                    "flood_image_url": self.image_service.get_flood_image,
-                    "tree_image_url": self.image_service.get_tree_image,
-                    "contour_image_url": self.image_service.get_contour_image,
-                    "water_image_url": self.image_service.get_water_image,
+                image_folders = {
+                    "image_url": "aerial",
+                    "road_frontage_image_url": "road_frontage",
+                    "flood_image_url": "flood_hazard",
+                    "tree_image_url": "tree_coverage",
+                    "contour_image_url": "contour",
+                    "water_image_url": "water_features",
                 }
-            futures = []
-            for key, func in analysis_tasks_map.items():
-                coro = self._exec_with_session(func, gid=None, geom=parcel_geom_wkt)
-                futures.append(self._safe_run(key, coro))
-            for key, func in image_tasks_map.items():
-                coro = self._exec_with_session(func, gid=gid, geom=parcel_geom_wkt)
-                futures.append(self._safe_run(key, coro))
-            results_list = await asyncio.gather(*futures)
-            analysis_results = {k: v for k, v in results_list}
-            def recursive_sanitize(obj: Any) -> Any:
-                if isinstance(obj, dict):
-                    return {k: recursive_sanitize(v) for k, v in obj.items()}
-                if isinstance(obj, list):
-                    return [recursive_sanitize(v) for v in obj]
-                if isinstance(obj, Decimal):
-                    return float(obj)
-                return obj
-
+            reused_images = {}
+            if image_folders and existing is not None:
+                # Rendering is the slowest part of an analysis; keep URLs that rendered fine last time.
+                reused_images = {
+                    key: existing[key] for key in image_folders
+                    if key in existing and not (isinstance(existing[key], dict) and "error" in existing[key])
+                }
+                image_folders = {k: v for k, v in image_folders.items() if k not in reused_images}
+            keys, coros = [], []
+            for key, func in raster_tasks_map.items():
+                keys.append(key)
+                coros.append(self._exec_with_session(func, gid=None, geom=parcel_geom_wkt))
+            if image_folders:
+                # By gid only, so already-stored images are served from the S3 key cache.
+                keys.append("images")
+                coros.append(self._exec_with_session(
+                    self.image_service.get_all_images, gid=gid, folders=list(image_folders.values())
+                ))
+            fused_results, *raw = await asyncio.gather(
+                self._run_fused_analyses(parcel_geom_ewkb, parcel_geom_wkt, fallback=analysis_tasks_map),
+                *coros,
+                return_exceptions=True,
+            )
+            if isinstance(fused_results, BaseException):
+                raise fused_results
+            analysis_results = {**dict(fused_results), **reused_images}
+            for key, value in zip(keys, raw):
+                if isinstance(value, BaseException):
+                    analysis_logger.error(f"Task '{key}' failed: {value}")
+                    value = {"error": str(value), "status": "failed"}
+                if key == "images":
+                    # A failed render marks every image it was producing as failed.
+                    failed = value if "error" in value else None
+                    for image_key, folder in image_folders.items():
+                        analysis_results[image_key] = failed or value[folder]
+                    continue
+                analysis_results[key] = value
             duration = time.perf_counter() - start_time
             
             final_output = {
-                "parcels": recursive_sanitize(parcel_data),
-                **recursive_sanitize(analysis_results),
+                "parcels": parcel_data,
+                **analysis_results,
                 "meta": {
                     "processing_mode": processing_mode,
                     "batch_id": batch_id,
@@ -4,12 +4,20 @@ S3 Service for accessing scrubbed CSV files from S3.
 Uses IAM roles for authentication (no access keys needed when deployed on EC2).
 """
 
-import io
 import logging
-from typing import Optional
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from operator import attrgetter
+from typing import Iterator, Optional
 
 import boto3
+from botocore.config import Config as BotoConfig
 from botocore.exceptions import ClientError
+from cachetools import TTLCache
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +26,28 @@ S3_BUCKET = "attom-scrubber-data"
 S3_REGION = "us-east-2"
 S3_PREFIX = "scrubbed/"
 S3_UPLOADS_PREFIX = "uploads/"
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB chunks for streaming downloads
+
+
+@dataclass(slots=True)
+class S3FileEntry:
+    """Metadata for one object returned by the list methods."""
+
+    key: str
+    name: str
+    relative_path: str
+    size: int
+    last_modified: datetime
+
+    def to_dict(self) -> dict:
+        """Serialize for API responses (last_modified as an ISO string)."""
+        return {
+            "key": self.key,
+            "name": self.name,
+            "relative_path": self.relative_path,
+            "size": self.size,
+            "last_modified": self.last_modified.isoformat(),
+        }
 
 
 def get_s3_client():
@@ -25,12 +55,17 @@ def get_s3_client():
     Get an S3 client using IAM role credentials.
 
     When running on EC2, boto3 automatically uses the instance's IAM role.
-    No access keys are needed.
+    No access keys are needed. Routes call the client from worker threads
+    (asyncio.to_thread), so the connection pool is sized for concurrent use.
 
     Returns:
         boto3.client: S3 client instance.
     """
-    return boto3.client("s3", region_name=S3_REGION)
+    return boto3.client(
+        "s3",
+        region_name=S3_REGION,
+        config=BotoConfig(max_pool_connections=64, retries={"mode": "adaptive"}),
+    )
 
 
 class S3ScrubService:
@@ -43,6 +78,14 @@ class S3ScrubService:
         self.prefix = S3_PREFIX
         self.uploads_prefix = S3_UPLOADS_PREFIX
         self._client: Optional[boto3.client] = None
+        # Directory prefix -> set of keys, so repeated files_exist calls reuse one listing.
+        self._listing_cache: TTLCache = TTLCache(maxsize=256, ttl=30)
+        # (method, prefix) -> result of the list_* methods, so UI navigation bursts share one listing.
+        self._list_cache: TTLCache = TTLCache(maxsize=256, ttl=30)
+        self._listing_lock = threading.Lock()
+        # (key, expiration, hour) -> URL handed out by download_url; entries expire with their hour.
+        self._url_cache: TTLCache = TTLCache(maxsize=1024, ttl=3600)
+        self._url_lock = threading.Lock()
 
     @property
     def client(self):
@@ -51,7 +94,30 @@ class S3ScrubService:
             self._client = get_s3_client()
         return self._client
 
-    def list_scrubbed_files(self, prefix: Optional[str] = None) -> list[dict]:
+    def _full_key(self, file_path: str) -> str:
+        """Resolve a path relative to the scrubbed folder to its full S3 key."""
+        if file_path.startswith(self.prefix):
+            return file_path
+        return f"{self.prefix}{file_path}"
+
+    def _cache_get(self, key: tuple) -> Optional[list]:
+        """Return a cached listing, or None if missing or expired."""
+        with self._listing_lock:
+            cached = self._list_cache.get(key)
+        return list(cached) if cached is not None else None
+
+    def _cache_set(self, key: tuple, value: list) -> None:
+        """Store a listing in the short-lived cache."""
+        with self._listing_lock:
+            self._list_cache[key] = list(value)
+
+    def _cache_invalidate(self, *methods: str) -> None:
+        """Drop every cached listing produced by the given list_* methods."""
+        with self._listing_lock:
+            for key in [k for k in self._list_cache if k[0] in methods]:
+                self._list_cache.pop(key, None)
+
+    def list_scrubbed_files(self, prefix: Optional[str] = None) -> list[S3FileEntry]:
         """
         List all CSV files in the scrubbed folder.
 
@@ -59,12 +125,17 @@ class S3ScrubService:
             prefix: Optional subdirectory prefix to filter by.
 
         Returns:
-            List of file metadata dictionaries containing:
+            List of S3FileEntry objects, newest first, containing:
                 - key: Full S3 key
                 - name: File name only
                 - size: File size in bytes
                 - last_modified: Last modification timestamp
         """
+        cache_key = ("list_scrubbed_files", prefix)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+
         search_prefix = self.prefix
         if prefix:
             search_prefix = f"{self.prefix}{prefix}/"
@@ -72,31 +143,29 @@ class S3ScrubService:
         try:
             paginator = self.client.get_paginator("list_objects_v2")
             files = []
+            base_prefix = self.prefix
+            prefix_len = len(base_prefix)
 
-            for page in paginator.paginate(Bucket=self.bucket, Prefix=search_prefix):
+            for page in paginator.paginate(
+                Bucket=self.bucket, Prefix=search_prefix, PaginationConfig={"PageSize": 1000}
+            ):
                 for obj in page.get("Contents", []):
                     key = obj["Key"]
-                    # Skip directory markers and non-CSV files
-                    if key.endswith("/") or not key.lower().endswith(".csv"):
+                    # Skip directory markers and non-CSV files (directory markers end in "/").
+                    # Only the 4-char suffix is lowercased, so ".Csv" etc. still match.
+                    if key[-4:].lower() != ".csv":
                         continue
 
                     # Extract just the filename (after the prefix)
-                    relative_path = key[len(self.prefix) :] if key.startswith(self.prefix) else key
+                    relative_path = key[prefix_len:] if key.startswith(base_prefix) else key
                     name = key.split("/")[-1]
 
-                    files.append(
-                        {
-                            "key": key,
-                            "name": name,
-                            "relative_path": relative_path,
-                            "size": obj["Size"],
-                            "last_modified": obj["LastModified"].isoformat(),
-                        }
-                    )
+                    files.append(S3FileEntry(key, name, relative_path, obj["Size"], obj["LastModified"]))
 
             # Sort by last modified, newest first
-            files.sort(key=lambda x: x["last_modified"], reverse=True)
+            files.sort(key=attrgetter("last_modified"), reverse=True)
             logger.info(f"Found {len(files)} CSV files in S3 bucket {self.bucket}/{search_prefix}")
+            self._cache_set(cache_key, files)
             return files
 
         except ClientError as e:
@@ -110,52 +179,48 @@ class S3ScrubService:
         Returns:
             List of directory names (e.g., ['2025-01-06', '2025-01-05']).
         """
-        try:
-            response = self.client.list_objects_v2(
-                Bucket=self.bucket, Prefix=self.prefix, Delimiter="/"
-            )
+        cache_key = ("list_directories", None)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
 
+        try:
+            # A single list_objects_v2 call stops at 1000 prefixes; page through all of them.
+            paginator = self.client.get_paginator("list_objects_v2")
             directories = []
-            for prefix_obj in response.get("CommonPrefixes", []):
-                prefix_path = prefix_obj["Prefix"]
-                # Extract directory name (remove trailing slash and base prefix)
-                dir_name = prefix_path[len(self.prefix) :].rstrip("/")
-                if dir_name:
-                    directories.append(dir_name)
+
+            for page in paginator.paginate(
+                Bucket=self.bucket, Prefix=self.prefix, Delimiter="/", PaginationConfig={"PageSize": 1000}
+            ):
+                for prefix_obj in page.get("CommonPrefixes", []):
+                    prefix_path = prefix_obj["Prefix"]
+                    # Extract directory name (remove trailing slash and base prefix)
+                    dir_name = prefix_path[len(self.prefix) :].rstrip("/")
+                    if dir_name:
+                        directories.append(dir_name)
 
             directories.sort(reverse=True)  # Newest first
             logger.info(f"Found {len(directories)} directories in S3")
+            self._cache_set(cache_key, directories)
             return directories
 
         except ClientError as e:
             logger.error(f"Error listing directories from S3: {e}")
             raise
 
-    def get_file_content(self, file_path: str) -> bytes:
+    def _get_object_body(self, file_path: str):
         """
-        Get the content of a specific file from S3.
-
-        Args:
-            file_path: Relative path to the file within the scrubbed folder.
-
-        Returns:
-            File content as bytes.
+        Open a file in S3 and return its unread streaming body.
 
         Raises:
             FileNotFoundError: If the file doesn't exist.
             ClientError: If there's an S3 error.
         """
-        # Build the full S3 key
-        if file_path.startswith(self.prefix):
-            key = file_path
-        else:
-            key = f"{self.prefix}{file_path}"
+        key = self._full_key(file_path)
 
         try:
             response = self.client.get_object(Bucket=self.bucket, Key=key)
-            content = response["Body"].read()
-            logger.info(f"Retrieved file from S3: {key} ({len(content)} bytes)")
-            return content
+            return response["Body"]
 
         except ClientError as e:
             if e.response["Error"]["Code"] == "NoSuchKey":
@@ -164,18 +229,55 @@ class S3ScrubService:
             logger.error(f"Error getting file from S3: {e}")
             raise
 
-    def get_file_stream(self, file_path: str) -> io.BytesIO:
+    def iter_file_chunks(self, file_path: str, chunk_size: int = DOWNLOAD_CHUNK_SIZE) -> Iterator[bytes]:
+        """
+        Yield a file's content from S3 in chunks without holding the whole object in memory.
+
+        Args:
+            file_path: Relative path to the file within the scrubbed folder.
+            chunk_size: Maximum size of each chunk in bytes.
+
+        Yields:
+            Successive chunks of the file content.
+        """
+        yield from self._get_object_body(file_path).iter_chunks(chunk_size)
+
+    def get_file_content(self, file_path: str) -> bytes:
+        """
+        Get the content of a specific file from S3.
+
+        Args:
+            file_path: Relative path to the file within the scrubbed folder.
+
+        Returns:
+            File content as bytes.
+
+        Raises:
+            FileNotFoundError: If the file doesn't exist.
+            ClientError: If there's an S3 error.
+        """
+        content = b"".join(self.iter_file_chunks(file_path))
+        logger.info(f"Retrieved file from S3: {self._full_key(file_path)} ({len(content)} bytes)")
+        return content
+
+    def get_file_stream(self, file_path: str, chunk_size: int = DOWNLOAD_CHUNK_SIZE) -> Iterator[bytes]:
         """
-        Get a file as a BytesIO stream for streaming downloads.
+        Get a file as a chunk iterator for streaming downloads.
+
+        Prefer download_url for user-facing downloads; streaming keeps the
+        transfer going through this process.
+
+        The object is opened here, so a missing file raises FileNotFoundError before
+        any bytes are streamed; the body is then read one chunk at a time.
 
         Args:
             file_path: Relative path to the file within the scrubbed folder.
+            chunk_size: Maximum size of each chunk in bytes.
 
         Returns:
-            BytesIO stream containing the file content.
+            Iterator over the file content, suitable for StreamingResponse.
         """
-        content = self.get_file_content(file_path)
-        return io.BytesIO(content)
+        return self._get_object_body(file_path).iter_chunks(chunk_size)
 
     def get_presigned_url(self, file_path: str, expiration: int = 3600) -> str:
         """
@@ -188,10 +290,7 @@ class S3ScrubService:
         Returns:
             Presigned URL string.
         """
-        if file_path.startswith(self.prefix):
-            key = file_path
-        else:
-            key = f"{self.prefix}{file_path}"
+        key = self._full_key(file_path)
 
         try:
             url = self.client.generate_presigned_url(
@@ -206,6 +305,35 @@ class S3ScrubService:
             logger.error(f"Error generating presigned URL: {e}")
             raise
 
+    def download_url(self, file_path: str, expiration: int = 3600) -> str:
+        """
+        Get a URL the client can download a file from directly.
+
+        User-facing download endpoints should redirect to this URL
+        (RedirectResponse) rather than stream the bytes through the API.
+        The expiration is rounded down to whole hours (minimum one hour), and
+        the URL is generated once per file per clock hour and reused, so links
+        handed out within the hour are identical (cacheable by browsers/CDNs).
+        It is signed for one extra hour, so it stays valid for at least
+        `expiration` seconds after it is handed out.
+
+        Args:
+            file_path: Relative path to the file within the scrubbed folder.
+            expiration: Requested URL lifetime in seconds.
+
+        Returns:
+            Presigned URL string.
+        """
+        expiration = max(3600, expiration - expiration % 3600)
+        cache_key = (self._full_key(file_path), expiration, int(time.time() // 3600))
+        with self._url_lock:
+            url = self._url_cache.get(cache_key)
+        if url is None:
+            url = self.get_presigned_url(file_path, expiration=expiration + 3600)
+            with self._url_lock:
+                self._url_cache[cache_key] = url
+        return url
+
     def file_exists(self, file_path: str) -> bool:
         """
         Check if a file exists in S3.
@@ -216,19 +344,71 @@ class S3ScrubService:
         Returns:
             True if the file exists, False otherwise.
         """
-        if file_path.startswith(self.prefix):
-            key = file_path
-        else:
-            key = f"{self.prefix}{file_path}"
+        key = self._full_key(file_path)
 
         try:
             self.client.head_object(Bucket=self.bucket, Key=key)
             return True
         except ClientError as e:
-            if e.response["Error"]["Code"] == "404":
+            # HEAD has no body, so the code varies ("404", "NotFound", "NoSuchKey"); the status does not.
+            error = e.response.get("Error", {})
+            status = e.response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+            if error.get("Code") in ("404", "NoSuchKey", "NotFound") or status == 404:
                 return False
             raise
 
+    def _list_keys(self, prefix: str) -> set[str]:
+        """Return every key under a prefix, served from the short-lived listing cache."""
+        with self._listing_lock:
+            keys = self._listing_cache.get(prefix)
+        if keys is not None:
+            return keys
+
+        paginator = self.client.get_paginator("list_objects_v2")
+        keys = set()
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+            for obj in page.get("Contents", []):
+                keys.add(obj["Key"])
+
+        with self._listing_lock:
+            self._listing_cache[prefix] = keys
+        return keys
+
+    def _invalidate_listing(self, prefix: str) -> None:
+        """Drop cached listings that may include keys under the given prefix."""
+        with self._listing_lock:
+            for cached in [p for p in self._listing_cache if p.startswith(prefix) or prefix.startswith(p)]:
+                self._listing_cache.pop(cached, None)
+
+    def files_exist(self, file_paths: list[str]) -> dict[str, bool]:
+        """
+        Check many files at once with one listing per directory instead of a HEAD per file.
+
+        Args:
+            file_paths: Relative paths to files within the scrubbed folder.
+
+        Returns:
+            Dict mapping each requested path to whether it exists.
+        """
+        by_prefix: dict[str, list[tuple[str, str]]] = {}
+        for file_path in file_paths:
+            key = self._full_key(file_path)
+            prefix = os.path.dirname(key)
+            prefix = f"{prefix}/" if prefix else ""
+            by_prefix.setdefault(prefix, []).append((file_path, key))
+
+        try:
+            result = {}
+            for prefix, entries in by_prefix.items():
+                keys = self._list_keys(prefix)
+                for file_path, key in entries:
+                    result[file_path] = key in keys
+            return result
+
+        except ClientError as e:
+            logger.error(f"Error checking files in S3: {e}")
+            raise
+
     def delete_file(self, file_path: str) -> bool:
         """
         Delete a file from S3.
@@ -239,13 +419,12 @@ class S3ScrubService:
         Returns:
             True if deletion was successful.
         """
-        if file_path.startswith(self.prefix):
-            key = file_path
-        else:
-            key = f"{self.prefix}{file_path}"
+        key = self._full_key(file_path)
 
         try:
             self.client.delete_object(Bucket=self.bucket, Key=key)
+            self._invalidate_listing(key)
+            self._cache_invalidate("list_scrubbed_files", "list_directories")
             logger.info(f"Deleted file from S3: {key}")
             return True
 
@@ -262,6 +441,9 @@ class S3ScrubService:
 
         Returns:
             Number of files deleted.
+
+        Raises:
+            RuntimeError: If S3 reports keys it could not delete.
         """
         prefix = f"{self.prefix}{directory}/"
 
@@ -278,14 +460,30 @@ class S3ScrubService:
                 logger.info(f"No files found in directory: {directory}")
                 return 0
 
-            # Delete in batches of 1000 (S3 limit)
-            deleted_count = 0
-            for i in range(0, len(objects_to_delete), 1000):
-                batch = objects_to_delete[i : i + 1000]
-                self.client.delete_objects(
+            # Delete in batches of 1000 (S3 limit), several batches in flight at once
+            batches = [objects_to_delete[i : i + 1000] for i in range(0, len(objects_to_delete), 1000)]
+
+            def delete_batch(batch: list[dict]) -> dict:
+                return self.client.delete_objects(
                     Bucket=self.bucket, Delete={"Objects": batch, "Quiet": True}
                 )
-                deleted_count += len(batch)
+
+            try:
+                with ThreadPoolExecutor(max_workers=16) as executor:
+                    responses = list(executor.map(delete_batch, batches))
+            finally:
+                self._invalidate_listing(prefix)
+                self._cache_invalidate("list_scrubbed_files", "list_directories")
+
+            # Quiet mode only reports the keys that could not be deleted
+            errors = [error for response in responses for error in response.get("Errors", [])]
+            deleted_count = len(objects_to_delete) - len(errors)
+            if errors:
+                for error in errors[:10]:
+                    logger.error(f"Failed to delete {error.get('Key')}: {error.get('Code')} {error.get('Message')}")
+                raise RuntimeError(
+                    f"Failed to delete {len(errors)} of {len(objects_to_delete)} files from directory: {directory}"
+                )
 
             logger.info(f"Deleted {deleted_count} files from directory: {directory}")
             return deleted_count
@@ -388,6 +586,8 @@ class S3ScrubService:
                     ContentType=content_type,
                 )
 
+            self._cache_invalidate("list_uploaded_files")
+
             # Generate the S3 URL
             url = f"https://{self.bucket}.s3.{self.region}.amazonaws.com/{key}"
 
@@ -406,7 +606,7 @@ class S3ScrubService:
             logger.error(f"Error uploading file to S3: {e}")
             raise
 
-    def list_uploaded_files(self, prefix: Optional[str] = None) -> list[dict]:
+    def list_uploaded_files(self, prefix: Optional[str] = None) -> list[S3FileEntry]:
         """
         List all files in the uploads folder.
 
@@ -414,8 +614,13 @@ class S3ScrubService:
             prefix: Optional subdirectory prefix to filter by.
 
         Returns:
-            List of file metadata dictionaries.
+            List of S3FileEntry objects, newest first.
         """
+        cache_key = ("list_uploaded_files", prefix)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+
         search_prefix = self.uploads_prefix
         if prefix:
             search_prefix = f"{self.uploads_prefix}{prefix}/"
@@ -423,28 +628,25 @@ class S3ScrubService:
         try:
             paginator = self.client.get_paginator("list_objects_v2")
             files = []
+            base_prefix = self.uploads_prefix
+            prefix_len = len(base_prefix)
 
-            for page in paginator.paginate(Bucket=self.bucket, Prefix=search_prefix):
+            for page in paginator.paginate(
+                Bucket=self.bucket, Prefix=search_prefix, PaginationConfig={"PageSize": 1000}
+            ):
                 for obj in page.get("Contents", []):
                     key = obj["Key"]
                     if key.endswith("/"):
                         continue
 
-                    relative_path = key[len(self.uploads_prefix):] if key.startswith(self.uploads_prefix) else key
+                    relative_path = key[prefix_len:] if key.startswith(base_prefix) else key
                     name = key.split("/")[-1]
 
-                    files.append(
-                        {
-                            "key": key,
-                            "name": name,
-                            "relative_path": relative_path,
-                            "size": obj["Size"],
-                            "last_modified": obj["LastModified"].isoformat(),
-                        }
-                    )
+                    files.append(S3FileEntry(key, name, relative_path, obj["Size"], obj["LastModified"]))
 
-            files.sort(key=lambda x: x["last_modified"], reverse=True)
+            files.sort(key=attrgetter("last_modified"), reverse=True)
             logger.info(f"Found {len(files)} files in uploads")
+            self._cache_set(cache_key, files)
             return files
 
         except ClientError as e:
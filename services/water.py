@@ -1,33 +1,206 @@
-import json
+import asyncio
 import logging
-from typing import Dict, Any, Optional, Tuple, List
-from collections import defaultdict
+from functools import lru_cache
+from typing import Callable, Dict, Any, Optional, Tuple, List
 
+import numpy as np
+import shapely
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import text
-from shapely.geometry import shape
-from shapely import wkt
+
+from db import schema_has
+from utils.spatial_sql import fetch_query_parts, to_ewkb
 
 logger = logging.getLogger(__name__)
 
+_M2_TO_ACRES = 1.0 / 4046.86
+_M_TO_FT = 3.28084
+
+# Each analysis is a set of labeled SELECTs run as one statement (utils.spatial_sql.fetch_query_parts),
+# so AnalysisService can fuse them across analyses into a single round trip. The target
+# geometry is bound once as :ewkb (see utils.spatial_sql.to_ewkb).
+
+# Target geometry decoded and projected once per query rather than at every use.
+# (The KNN ORDER BY in WATER_WELLS_QUERIES keeps the bare parameter so it stays index-driven.)
+_TARGET_CTE = """p AS MATERIALIZED (
+            SELECT ST_GeomFromEWKB(:ewkb) AS g4326,
+                   ST_Transform(ST_GeomFromEWKB(:ewkb), 3083) AS g3083
+        )"""
+
+WATER_WELLS_QUERIES = {
+    "rows": """
+        SELECT welltype, proposedus, boreholede, injuriousw ,wellowner
+        FROM water_wells
+        WHERE ST_Intersects(geom, ST_GeomFromEWKB(:ewkb))
+    """,
+    # Index-ordered KNN (planar, degrees) picks a few candidates; geodesic distance is computed for
+    # those only and decides the winner, since degree distance skews east-west vs north-south.
+    "nearest": """
+        SELECT welltype, proposedus, boreholede, injuriousw, wellowner,
+               ST_Distance(ST_GeomFromEWKB(:ewkb)::geography, geom::geography) AS distance_m
+        FROM (
+            SELECT welltype, proposedus, boreholede, injuriousw, wellowner, geom
+            FROM water_wells
+            ORDER BY geom <-> ST_GeomFromEWKB(:ewkb)
+            LIMIT 8
+        ) candidates
+        ORDER BY distance_m
+        LIMIT 1
+    """,
+}
+def _wetlands_queries(source: str) -> Dict[str, str]:
+    return {
+        "area": """
+            SELECT ST_Area(ST_Transform(ST_GeomFromEWKB(:ewkb), 3083)) AS area_m2
+        """,
+        # One row per wetland type, largest first.
+        "rows": f"""
+            WITH {_TARGET_CTE}
+            SELECT w.wetland_type, SUM(ST_Area(ST_Intersection(p.g3083, ST_Transform(w.geom, 3083)))) AS area_m2
+            FROM {source} w, p
+            WHERE ST_Intersects(p.g4326, w.geom)
+            GROUP BY w.wetland_type
+            HAVING SUM(ST_Area(ST_Intersection(p.g3083, ST_Transform(w.geom, 3083)))) > 0
+            ORDER BY area_m2 DESC
+        """,
+    }
+
+
+# Reads the subdivided copy (db.migrations, wetlands_subdiv); summed areas match wetlands.
+WETLANDS_QUERIES = _wetlands_queries("wetlands_subdiv")
+# Same result from the base table, used until the wetlands_subdiv migration has run.
+WETLANDS_BASE_QUERIES = _wetlands_queries("wetlands")
+
+
+async def resolve_wetlands_queries(session: AsyncSession) -> Dict[str, str]:
+    return WETLANDS_QUERIES if await schema_has(session, "wetlands_subdiv") else WETLANDS_BASE_QUERIES
+
+PONDS_QUERIES = {
+    # Definition: Pond if total acres <= 12 (unknown size counts as a pond)
+    "row": f"""
+        WITH {_TARGET_CTE}
+        SELECT COALESCE(SUM(inter_m2), 0) AS inter_m2, COUNT(*) AS pond_count
+        FROM (
+            SELECT ST_Area(ST_Intersection(p.g3083, ST_Transform(rw.geom, 3083))) AS inter_m2
+            FROM radcorp_water rw, p
+            WHERE rw.ftype_str = 'LakePond'
+              AND (rw.acres IS NULL OR rw.acres <= 12)
+              AND ST_Intersects(p.g4326, rw.geom)
+        ) ponds
+        WHERE inter_m2 > 0
+    """,
+}
+LAKES_QUERIES = {
+    "row": f"""
+        WITH {_TARGET_CTE}
+        SELECT COALESCE(SUM(perimeter_m), 0) AS perimeter_m,
+               COALESCE(SUM(area_m2), 0) AS area_m2,
+               COUNT(*) AS lake_count
+        FROM (
+            SELECT ST_Length(ST_Intersection(ST_Boundary(rw_geom), p.g3083)) AS perimeter_m,
+                   ST_Area(ST_Intersection(rw_geom, p.g3083)) AS area_m2
+            FROM radcorp_water rw
+            CROSS JOIN p
+            CROSS JOIN LATERAL (SELECT ST_Transform(rw.geom, 3083) AS rw_geom) t
+            WHERE rw.ftype_str = 'LakePond'
+              AND ST_Intersects(rw.geom, p.g4326)
+              AND rw.acres > 12
+        ) lakes
+        WHERE area_m2 > 0
+    """,
+}
+STREAMS_QUERIES = {
+    "row": f"""
+        WITH {_TARGET_CTE}
+        SELECT COALESCE(SUM(ST_Length(ST_Intersection(ST_Transform(s.geom, 3083), p.g3083))), 0.0) * 3.28084 AS length_ft
+        FROM stream s, p
+        WHERE ST_Intersects(s.geom, p.g4326)
+    """,
+}
+FLOOD_HAZARD_QUERIES = {
+    "area": """
+        SELECT ST_Area(ST_Transform(ST_GeomFromEWKB(:ewkb), 3083)) AS area_m2
+    """,
+    # One row per hazardous (non-X) zone, largest first
+    "rows": f"""
+        WITH {_TARGET_CTE}
+        SELECT fh.fld_zone, SUM(ST_Area(ST_Intersection(ST_Transform(fh.geom, 3083), p.g3083))) AS area_m2
+        FROM tx_fld_haz fh, p
+        WHERE ST_Intersects(fh.geom, p.g4326)
+          AND fh.fld_zone IS DISTINCT FROM 'X'
+        GROUP BY fh.fld_zone
+        HAVING SUM(ST_Area(ST_Intersection(ST_Transform(fh.geom, 3083), p.g3083))) > 0
+        ORDER BY area_m2 DESC
+    """,
+}
+# Uses table 'texas_sea_ocean_project' (mapped as SeaOcean model)
+SEA_OCEAN_QUERIES = {
+    "row": f"""
+        WITH {_TARGET_CTE}
+        SELECT COALESCE(SUM(ST_Length(ST_Intersection(ST_Transform(s.geom, 3083), p.g3083))), 0.0) * 3.28084 AS length_ft
+        FROM texas_sea_ocean_project s, p
+        WHERE ST_Intersects(s.geom, p.g4326)
+    """,
+}
+SHORELINE_QUERIES = {
+    "rows": f"""
+        WITH {_TARGET_CTE},
+        wetland_lengths AS (
+            SELECT w.wetland_type, ST_Length(ST_Intersection(p.g3083, ST_Transform(w.geom, 3083))) as len_m
+            FROM wetlands w, p
+            WHERE ST_Intersects(w.geom, p.g4326)
+            AND w.wetland_type IN ('Riverine', 'Lake')
+        ),
+        beach_lengths AS (
+            SELECT ST_Length(ST_Intersection(p.g3083, ST_Transform(wb.geom, 3083))) as len_m
+            FROM tx_water_bodies wb, p
+            WHERE ST_Intersects(wb.geom, p.g4326)
+            AND wb.body_typ = 'Sea/Ocean'
+        )
+        SELECT 'wetland' AS source, wetland_type AS feature_type, SUM(len_m) AS len_m FROM wetland_lengths GROUP BY wetland_type
+        UNION ALL
+        SELECT 'beach', 'beach', SUM(len_m) FROM beach_lengths
+    """,
+}
+
+
+@lru_cache(maxsize=512)
+def _parse_geometry(geom_str: str) -> Any:
+    """Parses GeoJSON or WKT once per distinct string (Shapely geometries are immutable, so safe to share)."""
+    input_str = geom_str.strip()
+    # GEOS readers straight from the string; no intermediate dict / per-coordinate Python floats.
+    if input_str.startswith("{"):
+        return shapely.from_geojson(input_str)
+    return shapely.from_wkt(input_str)
+
+
+def _column(rows: List[Dict[str, Any]], name: str) -> np.ndarray:
+    """One numeric column of the fetched rows as a float64 array (NULL -> 0)."""
+    return np.fromiter((r[name] or 0.0 for r in rows), dtype=np.float64, count=len(rows))
+
+
 class WaterAnalysisService:
     """
     Centralized service for all Water-related analysis.
     Supports analysis by Database GID OR Raw Geometry input.
     """
 
-    async def _get_target_geometry( self, session: AsyncSession, gid: Optional[int] = None, geom_input: Optional[str] = None) -> Tuple[str, Any]:
+    async def _get_target_geometry( self, session: AsyncSession, gid: Optional[int] = None, geom_input: Optional[str] = None) -> Tuple[bytes, Any]:
         """
-        Internal Helper: Resolves the target geometry to WKT and Shapely object.
+        Internal Helper: Resolves the target geometry to EWKB (bound as :ewkb) and Shapely object.
+        Memoized per session, so analyses composed on one session resolve the parcel once.
         """
+        cache = session.info.setdefault("_water_geom_cache", {})
+        key = (gid, geom_input)
+        if key not in cache:
+            cache[key] = await self._resolve_target_geometry(session, gid, geom_input)
+        return cache[key]
+
+    async def _resolve_target_geometry(self, session: AsyncSession, gid: Optional[int] = None, geom_input: Optional[str] = None) -> Tuple[bytes, Any]:
         if geom_input:
             try:
-                input_str = geom_input.strip()
-                if input_str.startswith("{"):
-                    shapely_geom = shape(json.loads(input_str))
-                else:
-                    shapely_geom = wkt.loads(input_str)
-                return shapely_geom.wkt, shapely_geom
+                shapely_geom = _parse_geometry(geom_input)
+                return to_ewkb(shapely_geom), shapely_geom
             except Exception as e:
                 logger.error(f"Failed to parse provided geometry: {e}")
                 raise ValueError(f"Invalid geometry format: {e}")
@@ -35,14 +208,15 @@ class WaterAnalysisService:
         # 2. Handle GID Lookup
         if gid:
             try:
-                query = text("SELECT ST_AsText(geom) FROM parcels WHERE gid = :gid")
+                # EWKB straight from the table: bound back as-is, no WKT text round trip.
+                query = text("SELECT ST_AsEWKB(geom) FROM parcels WHERE gid = :gid")
                 result = await session.execute(query, {"gid": gid})
                 row = result.fetchone()
                 if not row:
                     raise ValueError(f"Parcel GID {gid} not found.")
                 
-                shapely_geom = wkt.loads(row[0])
-                return row[0], shapely_geom
+                ewkb = bytes(row[0])
+                return ewkb, shapely.from_wkb(ewkb)
             except Exception as e:
                 logger.error(f"Database error fetching GID {gid}: {e}")
                 raise
@@ -54,50 +228,37 @@ class WaterAnalysisService:
         Checks intersection with Groundwater Wells. 
         If no intersection, finds the nearest well.
         """
-        target_wkt, _ = await self._get_target_geometry(session, gid, geom)
-        sql_intersect = text("""
-            SELECT welltype, proposedus, boreholede, injuriousw ,wellowner
-            FROM water_wells
-            WHERE ST_Intersects(geom, ST_GeomFromText(:wkt, 4326))
-        """)
-        
-        res = await session.execute(sql_intersect, {"wkt": target_wkt})
-        rows = res.fetchall()
-        
+        ewkb, _ = await self._get_target_geometry(session, gid, geom)
+        data = await fetch_query_parts(session, WATER_WELLS_QUERIES, {"ewkb": ewkb})
+        return self.summarize_water_wells(data)
+
+    def summarize_water_wells(self, data: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
+        rows = data["rows"]
         if rows:
             wells = [
                 {
-                    "WellType": r[0],
-                    "ProposedUse": r[1],
-                    "Depth": float(r[2]) if r[2] is not None else None,
-                    "Injurious": r[3],
-                    "Owner": r[4]
+                    "WellType": r["welltype"],
+                    "ProposedUse": r["proposedus"],
+                    "Depth": float(r["boreholede"]) if r["boreholede"] is not None else None,
+                    "Injurious": r["injuriousw"],
+                    "Owner": r["wellowner"]
                 } for r in rows
             ]
             return {"intersects": True, "count": len(wells), "wells": wells}
-        sql_nearest = text("""
-            SELECT welltype, proposedus, boreholede, injuriousw,wellowner,
-                   ST_Distance(ST_GeomFromText(:wkt, 4326)::geography, geom::geography) AS distance_m
-            FROM water_wells
-            ORDER BY geom <-> ST_GeomFromText(:wkt, 4326)
-            LIMIT 1
-        """)
-        
-        res_near = await session.execute(sql_nearest, {"wkt": target_wkt})
-        nearest = res_near.fetchone()
-        
+
+        nearest = data["nearest"][0] if data["nearest"] else None
         if nearest:
             return {
                 "intersects": False,
                 "count": 0,
                 "wells": [],
                 "nearest": {
-                    "WellType": nearest[0],
-                    "ProposedUse": nearest[1],
-                    "Depth": float(nearest[2]) if nearest[2] is not None else None,
-                    "Injurious": nearest[3],
-                    "Owner": nearest[4],
-                    "distance_m": round(nearest[5], 2)
+                    "WellType": nearest["welltype"],
+                    "ProposedUse": nearest["proposedus"],
+                    "Depth": float(nearest["boreholede"]) if nearest["boreholede"] is not None else None,
+                    "Injurious": nearest["injuriousw"],
+                    "Owner": nearest["wellowner"],
+                    "distance_m": round(nearest["distance_m"], 2)
                 }
             }
             
@@ -108,42 +269,29 @@ class WaterAnalysisService:
         Analyzes NWI Wetlands intersection, calculating area and percentage.
         Uses EPSG:3083 for accurate area calculations.
         """
-        target_wkt, _ = await self._get_target_geometry(session, gid, geom)
-        area_query = text("""
-            SELECT ST_Area(ST_Transform(ST_GeomFromText(:wkt, 4326), 3083))
-        """)
-        area_res = await session.execute(area_query, {"wkt": target_wkt})
-        total_area_m2 = area_res.scalar() or 0.0
+        ewkb, _ = await self._get_target_geometry(session, gid, geom)
+        data = await fetch_query_parts(session, await resolve_wetlands_queries(session), {"ewkb": ewkb})
+        return self.summarize_wetlands(data)
+
+    def summarize_wetlands(self, data: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
+        total_area_m2 = (data["area"][0]["area_m2"] if data["area"] else None) or 0.0
         
         if total_area_m2 == 0:
             return {"error": "Invalid or zero parcel area"}
-        total_area_acres = total_area_m2 / 4046.86
-        sql = text("""
-            SELECT 
-                w.wetland_type,
-                ST_Area(ST_Transform(ST_Intersection(ST_GeomFromText(:wkt, 4326), w.geom), 3083)) as area_m2
-            FROM wetlands w
-            WHERE ST_Intersects(ST_GeomFromText(:wkt, 4326), w.geom)
-        """)
-
-        res = await session.execute(sql, {"wkt": target_wkt})
-        rows = res.fetchall()
-        aggregated = defaultdict(lambda: {"area_acres": 0.0, "percentage": 0.0})
-        total_wetland_acres = 0.0
-        for w_type, area_m2 in rows:
-            if area_m2 > 0:
-                acres = area_m2 / 4046.86
-                aggregated[w_type]["area_acres"] += acres
-                total_wetland_acres += acres
-
-        results = []
-        for w_type, data in aggregated.items():
-            pct = (data["area_acres"] / total_area_acres) * 100
-            results.append({
-                "wetland_type": w_type,
-                "area_acres": round(data["area_acres"], 2),
-                "percentage": round(pct, 2)
-            })
+        total_area_acres = total_area_m2 * _M2_TO_ACRES
+        rows = data["rows"]
+        type_acres = _column(rows, "area_m2") * _M2_TO_ACRES
+        type_pcts = (type_acres / total_area_acres) * 100
+        total_wetland_acres = float(type_acres.sum())
+
+        results = [
+            {
+                "wetland_type": r["wetland_type"],
+                "area_acres": round(float(area), 2),
+                "percentage": round(float(pct), 2)
+            }
+            for r, area, pct in zip(rows, type_acres, type_pcts)
+        ]
 
         cleared_acres = max(total_area_acres - total_wetland_acres, 0)
         cleared_pct = (cleared_acres / total_area_acres) * 100
@@ -160,28 +308,14 @@ class WaterAnalysisService:
         Analyzes Ponds (LakePond <= 12 acres) from `radcorp_water`.
         Falls back to 'wetlands' if no specific pond found.
         """
-        target_wkt, _ = await self._get_target_geometry(session, gid, geom)
+        ewkb, _ = await self._get_target_geometry(session, gid, geom)
+        data = await fetch_query_parts(session, PONDS_QUERIES, {"ewkb": ewkb})
+        return self.summarize_ponds(data)
 
-        sql = text("""
-            SELECT rw.acres, 
-                   ST_Area(ST_Intersection(ST_Transform(ST_GeomFromText(:wkt, 4326), 3083), 
-                                           ST_Transform(rw.geom, 3083))) as inter_m2
-            FROM radcorp_water rw
-            WHERE rw.ftype_str = 'LakePond'
-              AND ST_Intersects(ST_GeomFromText(:wkt, 4326), rw.geom)
-        """)
-
-        res = await session.execute(sql, {"wkt": target_wkt})
-        rows = res.fetchall()
-
-        total_pond_acres = 0.0
-        unique_count = 0
-        
-        for acres, inter_m2 in rows:
-            # Definition: Pond if total acres <= 12
-            if inter_m2 > 0 and (acres is None or acres <= 12):
-                total_pond_acres += (inter_m2 / 4046.86)
-                unique_count += 1
+    def summarize_ponds(self, data: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
+        row = data["row"][0]
+        total_pond_acres = row["inter_m2"] * _M2_TO_ACRES
+        unique_count = row["pond_count"]
 
         if unique_count > 0:
             return {
@@ -197,33 +331,15 @@ class WaterAnalysisService:
         Analyzes Lakes (LakePond > 12 acres) from `radcorp_water`.
         Calculates shared perimeter (shoreline) and area.
         """
-        target_wkt, _ = await self._get_target_geometry(session, gid, geom)
-        sql = text("""
-            SELECT rw.acres,
-                   ST_Length(ST_Intersection(
-                       ST_Boundary(ST_Transform(rw.geom, 3083)),
-                       ST_Transform(ST_GeomFromText(:wkt, 4326), 3083)
-                   )) as perimeter_m,
-                   ST_Area(ST_Intersection(
-                       ST_Transform(rw.geom, 3083),
-                       ST_Transform(ST_GeomFromText(:wkt, 4326), 3083)
-                   )) as area_m2
-            FROM radcorp_water rw
-            WHERE rw.ftype_str = 'LakePond'
-              AND ST_Intersects(rw.geom, ST_GeomFromText(:wkt, 4326))
-              AND rw.acres > 12
-        """)
-        res = await session.execute(sql, {"wkt": target_wkt})
-        rows = res.fetchall()
-        total_perimeter_ft = 0.0
-        total_area_acres = 0.0
-        count = 0
-        for acres, perim_m, area_m in rows:
-            if area_m > 0:
-                count += 1
-                total_area_acres += (area_m / 4046.86)
-                if perim_m:
-                    total_perimeter_ft += (perim_m * 3.28084)
+        ewkb, _ = await self._get_target_geometry(session, gid, geom)
+        data = await fetch_query_parts(session, LAKES_QUERIES, {"ewkb": ewkb})
+        return self.summarize_lakes(data)
+
+    def summarize_lakes(self, data: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
+        row = data["row"][0]
+        count = row["lake_count"]
+        total_area_acres = row["area_m2"] * _M2_TO_ACRES
+        total_perimeter_ft = (row["perimeter_m"] or 0.0) * _M_TO_FT
 
         return {
             "intersects": count > 0,
@@ -237,21 +353,12 @@ class WaterAnalysisService:
         Calculates total length of streams intersecting the property.
         Uses `public.stream` table.
         """
-        target_wkt, _ = await self._get_target_geometry(session, gid, geom)
-        sql = text("""
-            SELECT ST_Length(
-                ST_Intersection(
-                    ST_Transform(s.geom, 3083), 
-                    ST_Transform(ST_GeomFromText(:wkt, 4326), 3083)
-                )
-            ) as length_m
-            FROM stream s
-            WHERE ST_Intersects(s.geom, ST_GeomFromText(:wkt, 4326))
-        """)
-        res = await session.execute(sql, {"wkt": target_wkt})
-        rows = res.scalars().all()
-        total_m = sum(r for r in rows if r)
-        total_ft = total_m * 3.28084
+        ewkb, _ = await self._get_target_geometry(session, gid, geom)
+        data = await fetch_query_parts(session, STREAMS_QUERIES, {"ewkb": ewkb})
+        return self.summarize_streams(data)
+
+    def summarize_streams(self, data: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
+        total_ft = data["row"][0]["length_ft"]
         return {
             "intersects": total_ft > 0,
             "stream_length_ft": round(total_ft, 2)
@@ -260,36 +367,26 @@ class WaterAnalysisService:
         """
         Analyzes FEMA Flood Hazard zones intersection.
         """
-        target_wkt, _ = await self._get_target_geometry(session, gid, geom)
-        area_sql = text("SELECT ST_Area(ST_Transform(ST_GeomFromText(:wkt, 4326), 3083))")
-        total_m2 = (await session.execute(area_sql, {"wkt": target_wkt})).scalar() or 0.0
-        total_acres = total_m2 / 4046.86
-        sql = text("""
-            SELECT fh.fld_zone, 
-                   ST_Area(ST_Transform(ST_Intersection(fh.geom, ST_GeomFromText(:wkt, 4326)), 3083)) as area_m2
-            FROM tx_fld_haz fh
-            WHERE ST_Intersects(fh.geom, ST_GeomFromText(:wkt, 4326))
-        """)
-
-        res = await session.execute(sql, {"wkt": target_wkt})
-        rows = res.fetchall()
-
-        flood_zones = defaultdict(float)
-        hazardous_area_acres = 0.0
-
-        for zone, area_m in rows:
-            if area_m > 0 and zone != 'X':
-                ac = area_m / 4046.86
-                flood_zones[zone] += ac
-                hazardous_area_acres += ac
-
-        results = []
-        for zone, acres in flood_zones.items():
-            results.append({
-                "flood_zone": zone,
-                "area_acres": round(acres, 2),
-                "percentage": round((acres / total_acres * 100), 2) if total_acres > 0 else 0
-            })
+        ewkb, _ = await self._get_target_geometry(session, gid, geom)
+        data = await fetch_query_parts(session, FLOOD_HAZARD_QUERIES, {"ewkb": ewkb})
+        return self.summarize_flood_hazard(data)
+
+    def summarize_flood_hazard(self, data: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
+        total_m2 = (data["area"][0]["area_m2"] if data["area"] else None) or 0.0
+        total_acres = total_m2 * _M2_TO_ACRES
+
+        rows = data["rows"]
+        zone_acres = _column(rows, "area_m2") * _M2_TO_ACRES
+        hazardous_area_acres = float(zone_acres.sum())
+
+        results = [
+            {
+                "flood_zone": r["fld_zone"],
+                "area_acres": round(float(ac), 2),
+                "percentage": round(float(ac / total_acres * 100), 2) if total_acres > 0 else 0
+            }
+            for r, ac in zip(rows, zone_acres)
+        ]
 
         cleared = max(total_acres - hazardous_area_acres, 0)
         
@@ -305,21 +402,12 @@ class WaterAnalysisService:
 
     async def analyze_sea_ocean(self, session: AsyncSession, gid: Optional[int] = None, geom: Optional[str] = None) -> Dict[str, Any]:
         """Calculates intersection length with Sea/Ocean boundaries."""
-        target_wkt, _ = await self._get_target_geometry(session, gid, geom)
-
-        # Uses table 'texas_sea_ocean_project' (mapped as SeaOcean model)
-        sql = text("""
-            SELECT ST_Length(ST_Intersection(
-                ST_Transform(s.geom, 3083),
-                ST_Transform(ST_GeomFromText(:wkt, 4326), 3083)
-            ))
-            FROM texas_sea_ocean_project s
-            WHERE ST_Intersects(s.geom, ST_GeomFromText(:wkt, 4326))
-        """)
-
-        res = await session.execute(sql, {"wkt": target_wkt})
-        rows = res.scalars().all()
-        total_ft = sum(r for r in rows if r) * 3.28084
+        ewkb, _ = await self._get_target_geometry(session, gid, geom)
+        data = await fetch_query_parts(session, SEA_OCEAN_QUERIES, {"ewkb": ewkb})
+        return self.summarize_sea_ocean(data)
+
+    def summarize_sea_ocean(self, data: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
+        total_ft = data["row"][0]["length_ft"]
 
         return {
             "intersects": total_ft > 0,
@@ -331,36 +419,17 @@ class WaterAnalysisService:
         Aggregates shoreline lengths from Wetlands (Riverine, Lake) 
         and WaterBodies (Sea/Ocean).
         """
-        target_wkt, _ = await self._get_target_geometry(session, gid, geom)
-
-        sql = text("""
-            WITH parcel_geom AS (
-                SELECT ST_Transform(ST_GeomFromText(:wkt, 4326), 3083) as geom
-            ),
-            wetland_lengths AS (
-                SELECT w.wetland_type, ST_Length(ST_Intersection(p.geom, ST_Transform(w.geom, 3083))) as len_m
-                FROM wetlands w, parcel_geom p
-                WHERE ST_Intersects(w.geom, ST_GeomFromText(:wkt, 4326))
-                AND w.wetland_type IN ('Riverine', 'Lake')
-            ),
-            beach_lengths AS (
-                SELECT ST_Length(ST_Intersection(p.geom, ST_Transform(wb.geom, 3083))) as len_m
-                FROM tx_water_bodies wb, parcel_geom p
-                WHERE ST_Intersects(wb.geom, ST_GeomFromText(:wkt, 4326))
-                AND wb.body_typ = 'Sea/Ocean'
-            )
-            SELECT 'wetland', wetland_type, len_m FROM wetland_lengths
-            UNION ALL
-            SELECT 'beach', 'beach', len_m FROM beach_lengths
-        """)
-
-        res = await session.execute(sql, {"wkt": target_wkt})
-        
+        ewkb, _ = await self._get_target_geometry(session, gid, geom)
+        data = await fetch_query_parts(session, SHORELINE_QUERIES, {"ewkb": ewkb})
+        return self.summarize_shoreline(data)
+
+    def summarize_shoreline(self, data: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
         totals = {"riverine": 0.0, "lake": 0.0, "beach": 0.0}
         
-        for source, type_, len_m in res.fetchall():
+        for r in data["rows"]:
+            source, type_, len_m = r["source"], r["feature_type"], r["len_m"]
             if not len_m: continue
-            ft = len_m * 3.28084
+            ft = len_m * _M_TO_FT
             
             if source == 'beach':
                 totals["beach"] += ft
@@ -369,4 +438,40 @@ class WaterAnalysisService:
             elif type_ == 'Lake':
                 totals["lake"] += ft
 
-        return {k + "_length_ft": round(v, 2) for k, v in totals.items()}
\ No newline at end of file
+        return {k + "_length_ft": round(v, 2) for k, v in totals.items()}
+
+    async def analyze_all(self, session_factory: Callable[[], AsyncSession], gid: Optional[int] = None, geom: Optional[str] = None, max_concurrency: int = 8) -> Dict[str, Any]:
+        """
+        Full water report. The analyses hit different tables, so each runs concurrently on
+        its own pooled session (capped by max_concurrency); the target geometry is resolved
+        once up front and passed down as WKT. A failing analysis is reported in its slot.
+        """
+        async with session_factory() as session:
+            _, shapely_geom = await self._get_target_geometry(session, gid, geom)
+        target_wkt = shapely_geom.wkt
+
+        analyses = {
+            "well_analysis": self.analyze_water_wells,
+            "wetland_analysis": self.analyze_wetlands,
+            "pond_analysis": self.analyze_ponds,
+            "lake_analysis": self.analyze_lakes,
+            "stream_intersection": self.analyze_streams,
+            "flood_hazard": self.analyze_flood_hazard,
+            "sea_ocean_length": self.analyze_sea_ocean,
+            "shoreline_analysis": self.analyze_shoreline,
+        }
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def run(func: Callable) -> Dict[str, Any]:
+            async with semaphore:
+                async with session_factory() as session:
+                    return await func(session, geom=target_wkt)
+
+        results = await asyncio.gather(*(run(func) for func in analyses.values()), return_exceptions=True)
+        report = {}
+        for key, value in zip(analyses, results):
+            if isinstance(value, Exception):
+                logger.error(f"Water analysis '{key}' failed: {value}")
+                value = {"error": str(value), "status": "failed"}
+            report[key] = value
+        return report
@@ -0,0 +1,49 @@
+import pytest
+
+from config import config
+from services import auth
+from services.auth import AuthService
+
+
+@pytest.fixture(autouse=True)
+def jwt_secret(monkeypatch):
+    monkeypatch.setattr(config, "JWT_SECRET_KEY", "test-secret")
+    auth._token_cache.clear()
+    yield
+    auth._token_cache.clear()
+
+
+def test_verify_token_caches_decoded_payload(monkeypatch):
+    token = AuthService.create_access_token({"sub": "user@example.com"})
+    payload = AuthService.verify_token(token)
+    assert payload["sub"] == "user@example.com"
+
+    def no_decode(*args, **kwargs):
+        raise AssertionError("cached token was decoded again")
+
+    monkeypatch.setattr(auth.jwt, "decode", no_decode)
+    assert AuthService.verify_token(token) == payload
+
+
+def test_cached_payload_is_not_shared():
+    token = AuthService.create_access_token({"sub": "user@example.com"})
+    AuthService.verify_token(token)["sub"] = "changed by caller"
+    hit = AuthService.verify_token(token)
+    hit["sub"] = "changed again"
+    assert AuthService.verify_token(token)["sub"] == "user@example.com"
+
+
+def test_cached_token_still_expires(monkeypatch):
+    token = AuthService.create_access_token({"sub": "user@example.com"})
+    payload = AuthService.verify_token(token)
+    assert len(auth._token_cache) == 1
+
+    # Past exp but well inside the cache TTL: the hit must be rejected and evicted.
+    monkeypatch.setattr(auth.time, "time", lambda: payload["exp"] + 1)
+    assert AuthService.verify_token(token) is None
+    assert len(auth._token_cache) == 0
+
+
+def test_invalid_token_is_not_cached():
+    assert AuthService.verify_token("not-a-jwt") is None
+    assert len(auth._token_cache) == 0
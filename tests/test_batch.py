@@ -0,0 +1,39 @@
+import csv
+
+from services.batch import BatchService
+
+
+def _read(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        return reader.fieldnames, list(reader)
+
+
+def test_write_results_csv_uses_union_of_row_keys(tmp_path):
+    results = [
+        # A failed row carries only the input columns...
+        {"row": 1, "lat": 30.1, "analysis": {"error": "no parcel"}},
+        # ...an analysed one adds parcel fields and the flattened summaries.
+        {"row": 2, "lat": 30.2, "analysis": {"parcels": {"gid": 9, "county": "Travis"}}},
+    ]
+    path = tmp_path / "out.csv"
+
+    count = BatchService.write_results_csv(results, str(path))
+
+    fieldnames, rows = _read(path)
+    assert count == 2
+    assert fieldnames[:4] == ["row", "lat", "gid", "county"]
+    assert "flood_zone" in fieldnames and "img_topo" in fieldnames
+    assert rows[0]["gid"] == "" and rows[0]["flood_zone"] == ""
+    assert rows[1]["gid"] == "9" and rows[1]["flood_zone"] == "X"
+
+
+def test_write_results_csv_empty(tmp_path):
+    path = tmp_path / "out.csv"
+    assert BatchService.write_results_csv([], str(path)) == 0
+    assert path.read_text(encoding="utf-8").strip() == ""
+
+
+def test_flatten_iter_matches_list():
+    results = [{"row": 1, "analysis": {"parcels": {"gid": 3}}}]
+    assert list(BatchService.flatten_analysis_results_iter(results)) == BatchService().flatten_analysis_results(results)
@@ -0,0 +1,133 @@
+import asyncio
+
+from sqlalchemy.dialects import postgresql
+
+from services import parcel_analysis
+from services.parcel_analysis import AnalysisService
+
+
+class FakeSavepoint:
+    def __init__(self, session):
+        self.session = session
+
+    async def __aenter__(self):
+        self.session.pending = []
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        # Release on success, roll back to the savepoint on error (and let the error propagate).
+        if exc_type is None:
+            self.session.persisted.extend(self.session.pending)
+        self.session.pending = []
+        return False
+
+
+class FakeSession:
+    def __init__(self):
+        self.pending = []
+        self.persisted = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+    def begin_nested(self):
+        return FakeSavepoint(self)
+
+    async def rollback(self):
+        self.persisted = []
+
+
+class StubService:
+    _run_on_shared_session = AnalysisService._run_on_shared_session
+    _exec_with_session = AnalysisService._exec_with_session
+
+    def __init__(self):
+        self.semaphore = asyncio.Semaphore(1)
+
+
+def test_failed_task_keeps_sibling_work(monkeypatch):
+    session = FakeSession()
+    monkeypatch.setattr(parcel_analysis, "SessionLocal", lambda: session)
+
+    def task(name, fail=False):
+        async def run(db, **kwargs):
+            db.pending.append(name)
+            if fail:
+                raise RuntimeError(f"{name} failed")
+            return {"name": name}
+        return run
+
+    tasks = {"wells": task("wells"), "flood": task("flood", fail=True), "streams": task("streams")}
+    results = dict(asyncio.run(StubService()._run_on_shared_session(tasks, gid=None, geom="POINT(0 0)")))
+
+    assert results["wells"] == {"name": "wells"}
+    assert results["streams"] == {"name": "streams"}
+    assert results["flood"] == {"error": "flood failed", "status": "failed"}
+    assert session.persisted == ["wells", "streams"]
+
+
+class UpsertSession:
+    def __init__(self, inserted=True):
+        self.inserted = inserted
+        self.statements = []
+        self.committed = False
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return self
+
+    def scalar_one(self):
+        return self.inserted
+
+    async def commit(self):
+        self.committed = True
+
+    async def rollback(self):
+        pass
+
+
+class SaveStub:
+    _save_results = AnalysisService._save_results
+
+    def __init__(self):
+        self._result_cache = {7: {"stale": True}}
+        self._parcel_cache = {7: {"stale": True}}
+
+
+def test_save_results_is_a_single_upsert():
+    stub, session = SaveStub(), UpsertSession()
+    asyncio.run(stub._save_results(session, 7, {"ok": True}, "batch-1", "batch", csv_context=None))
+
+    assert len(session.statements) == 1 and session.committed
+    sql = str(session.statements[0].compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (parcel_gid) DO UPDATE" in sql
+    # A run without a CSV row keeps the stored one.
+    assert "coalesce(excluded.csv_source_data, analysis_results.csv_source_data)" in sql
+    assert stub._result_cache == {} and stub._parcel_cache == {}
+
+
+def test_parcel_data_query_falls_back_to_geom():
+    unmigrated = parcel_analysis._parcel_data_query(frozenset()).text
+    assert "ST_Centroid(p.geom)" in unmigrated
+    assert "p.geom_simplified" not in unmigrated and "p.city_name" not in unmigrated
+
+    migrated = parcel_analysis._parcel_data_query(frozenset(parcel_analysis._PARCEL_DERIVED_COLUMNS)).text
+    assert "ST_X(p.centroid)" in migrated and "ST_AsEWKB(p.geom_simplified)" in migrated
+    assert "p.acreage_computed::float8" in migrated and "p.city_name," in migrated
+
+
+class ExistingStub:
+    _get_existing_result = AnalysisService._get_existing_result
+
+    def __init__(self):
+        self._result_cache = {7: {"image_url": "cached"}}
+
+
+def test_existing_result_cache_hands_out_copies():
+    stub = ExistingStub()
+    existing = asyncio.run(stub._get_existing_result(7, session=None))
+    existing["image_url"] = {"error": "changed by caller"}
+    assert stub._result_cache[7] == {"image_url": "cached"}
@@ -0,0 +1,38 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+
+from services.parcel import ParcelSearch
+
+
+class RecordingSession:
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return self
+
+    def fetchall(self):
+        return [(1, 2)]
+
+
+@pytest.mark.parametrize("gids", [[], [7], [7, 7]])
+def test_check_adjacency_needs_two_distinct_gids(gids):
+    session = RecordingSession()
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(ParcelSearch().check_adjacency(session, gids))
+    assert exc.value.status_code == 400
+    assert session.statements == []
+
+
+def test_check_adjacency_joins_from_values_lists():
+    session = RecordingSession()
+    result = asyncio.run(ParcelSearch().check_adjacency(session, [2, 1, 2]))
+
+    assert result == {"are_adjacent": True, "adjacent_pairs": [(1, 2)]}
+    sql = str(session.statements[0].compile(dialect=postgresql.dialect()))
+    assert sql.count("VALUES") == 2
+    assert "ST_Touches" in sql
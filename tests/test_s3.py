@@ -0,0 +1,88 @@
+from services import s3
+from services.s3 import S3ScrubService
+
+
+class FakeClient:
+    def __init__(self, keys=(), page_size=1000):
+        self.calls = []
+        self.keys = list(keys)
+        self.page_size = page_size
+        self.listed = []
+
+    def get_paginator(self, operation):
+        return self
+
+    def paginate(self, Bucket, Prefix, **kwargs):
+        self.listed.append(Prefix)
+        keys = [key for key in self.keys if key.startswith(Prefix)]
+        for i in range(0, len(keys), self.page_size):
+            yield {"Contents": [{"Key": key, "Size": 1, "LastModified": i} for key in keys[i : i + self.page_size]]}
+
+    def delete_object(self, Bucket, Key):
+        self.keys.remove(Key)
+
+    def delete_objects(self, Bucket, Delete):
+        for obj in Delete["Objects"]:
+            self.keys.remove(obj["Key"])
+        return {}
+
+    def generate_presigned_url(self, operation, Params, ExpiresIn):
+        self.calls.append((operation, Params, ExpiresIn))
+        return f"https://example.com/{Params['Key']}?expires={ExpiresIn}&n={len(self.calls)}"
+
+
+def _service(keys=(), page_size=1000):
+    service = S3ScrubService()
+    service._client = FakeClient(keys, page_size)
+    return service
+
+
+def test_presigned_url_keeps_requested_expiration():
+    service = _service()
+    service.get_presigned_url("2025-01-06/part_1.csv", expiration=900)
+    assert service._client.calls == [
+        ("get_object", {"Bucket": s3.S3_BUCKET, "Key": "scrubbed/2025-01-06/part_1.csv"}, 900)
+    ]
+
+
+def test_download_url_is_stable_within_the_hour(monkeypatch):
+    service = _service()
+    monkeypatch.setattr(s3.time, "time", lambda: 7200.0 + 10)
+    first = service.download_url("2025-01-06/part_1.csv", expiration=5000)
+    monkeypatch.setattr(s3.time, "time", lambda: 7200.0 + 3500)
+    assert service.download_url("2025-01-06/part_1.csv", expiration=5000) == first
+    # Rounded down to whole hours, plus the hour the URL may be reused for.
+    assert [call[2] for call in service._client.calls] == [7200]
+
+    monkeypatch.setattr(s3.time, "time", lambda: 10800.0 + 1)
+    assert service.download_url("2025-01-06/part_1.csv", expiration=5000) != first
+    assert len(service._client.calls) == 2
+
+
+def test_list_scrubbed_files_matches_csv_case_insensitively():
+    service = _service(["scrubbed/d/a.csv", "scrubbed/d/b.CSV", "scrubbed/d/c.Csv", "scrubbed/d/", "scrubbed/d/e.txt"])
+    assert sorted(f.name for f in service.list_scrubbed_files()) == ["a.csv", "b.CSV", "c.Csv"]
+
+
+def test_files_exist_lists_each_directory_once():
+    keys = [f"scrubbed/a/part_{i}.csv" for i in range(5)] + ["scrubbed/b/part_0.csv"]
+    service = _service(keys, page_size=2)
+
+    found = service.files_exist(["a/part_0.csv", "a/part_4.csv", "a/missing.csv", "b/part_0.csv"])
+
+    assert found == {"a/part_0.csv": True, "a/part_4.csv": True, "a/missing.csv": False, "b/part_0.csv": True}
+    # One paginated listing per directory; part_4 is on the last page.
+    assert service._client.listed == ["scrubbed/a/", "scrubbed/b/"]
+    service.files_exist(["a/part_1.csv", "b/part_0.csv"])
+    assert service._client.listed == ["scrubbed/a/", "scrubbed/b/"]
+
+
+def test_deletes_evict_cached_listings():
+    service = _service(["scrubbed/a/part_0.csv", "scrubbed/a/part_1.csv", "scrubbed/b/part_0.csv"])
+    service.files_exist(["a/part_0.csv", "b/part_0.csv"])
+
+    service.delete_file("a/part_0.csv")
+    assert service.files_exist(["a/part_0.csv", "a/part_1.csv"]) == {"a/part_0.csv": False, "a/part_1.csv": True}
+
+    service.delete_directory("b")
+    assert service.files_exist(["b/part_0.csv"]) == {"b/part_0.csv": False}
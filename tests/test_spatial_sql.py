@@ -0,0 +1,49 @@
+import asyncio
+
+from sqlalchemy.dialects import postgresql
+
+from utils.spatial_sql import _parts_query, fetch_query_parts
+
+
+class FakeResult:
+    def __init__(self, value):
+        self.value = value
+
+    def scalar_one(self):
+        return self.value
+
+
+class FakeSession:
+    def __init__(self, value):
+        self.value = value
+        self.calls = []
+
+    async def execute(self, statement, params):
+        self.calls.append((statement, params))
+        return FakeResult(self.value)
+
+
+def test_parts_query_labels_each_subquery():
+    query = _parts_query((("wells", "SELECT 1 AS a;"), ("flood", "SELECT 2 AS b")))
+    sql = str(query.compile(dialect=postgresql.dialect()))
+
+    assert sql.startswith("SELECT jsonb_build_object(")
+    assert "'wells', (SELECT COALESCE(jsonb_agg(to_jsonb(q)), '[]'::jsonb) FROM (SELECT 1 AS a) q)" in sql
+    assert "'flood', (SELECT COALESCE(jsonb_agg(to_jsonb(q)), '[]'::jsonb) FROM (SELECT 2 AS b) q)" in sql
+
+
+def test_parts_query_is_built_once_per_part_set():
+    parts = (("rows", "SELECT 1"),)
+    assert _parts_query(parts) is _parts_query(parts)
+
+
+def test_fetch_query_parts_runs_one_statement():
+    rows = {"wells": [{"a": 1}], "flood": []}
+    session = FakeSession(rows)
+    parts = {"wells": "SELECT 1 AS a", "flood": "SELECT 2 AS b WHERE false"}
+
+    assert asyncio.run(fetch_query_parts(session, parts, {"ewkb": b"\x01"})) == rows
+    assert len(session.calls) == 1
+    statement, params = session.calls[0]
+    assert statement is _parts_query(tuple(parts.items()))
+    assert params == {"ewkb": b"\x01"}
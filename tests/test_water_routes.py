@@ -0,0 +1,27 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from db import get_session_factory
+from routes import water_routes
+
+
+def test_analyze_all_uses_injected_session_factory(monkeypatch):
+    calls = []
+
+    async def fake_analyze_all(session_factory, gid=None, geom=None):
+        calls.append((session_factory, gid))
+        return {"well_analysis": {"intersects": False}}
+
+    def factory():
+        raise AssertionError("the stubbed service never opens a session")
+
+    monkeypatch.setattr(water_routes.service, "analyze_all", fake_analyze_all)
+    app = FastAPI()
+    app.include_router(water_routes.router)
+    app.dependency_overrides[get_session_factory] = lambda: factory
+
+    response = TestClient(app).get("/water_analysis/all", params={"gid": 42})
+
+    assert response.status_code == 200
+    assert response.json() == {"well_analysis": {"intersects": False}}
+    assert calls == [(factory, 42)]
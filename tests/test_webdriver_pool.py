@@ -0,0 +1,86 @@
+import asyncio
+
+from utils.webdriver_pool import SESSION_ORIGINS, WebDriverPool
+
+
+class FakeDriver:
+    """Records CDP calls and, like Chromium, rejects anything that is not a concrete origin."""
+
+    def __init__(self):
+        self.cdp_calls = []
+        self.urls = []
+
+    def execute_cdp_cmd(self, cmd, params):
+        if cmd == "Storage.clearDataForOrigin" and not params["origin"].startswith("https://"):
+            raise RuntimeError(f"invalid origin: {params['origin']}")
+        self.cdp_calls.append((cmd, params))
+        return {}
+
+    def get(self, url):
+        self.urls.append(url)
+
+    def quit(self):
+        pass
+
+
+def _pool_with(driver, **kwargs):
+    pool = WebDriverPool(pool_size=1, **kwargs)
+    pool.usage_counts[id(driver)] = 0
+    pool.drivers.put_nowait(driver)
+    return pool
+
+
+def test_reset_session_clears_visited_origins():
+    driver = FakeDriver()
+    WebDriverPool._reset_session(driver)
+
+    cleared = [params["origin"] for cmd, params in driver.cdp_calls if cmd == "Storage.clearDataForOrigin"]
+    assert cleared == list(SESSION_ORIGINS)
+    assert ("Network.clearBrowserCookies", {}) in driver.cdp_calls
+    assert driver.urls == ["about:blank"]
+
+
+def test_reset_does_not_replace_driver():
+    async def scenario():
+        driver = FakeDriver()
+        pool = _pool_with(driver, max_uses=1, max_resets=10)
+        replaced = []
+
+        async def fake_replace(d):
+            replaced.append(d)
+
+        pool._replace_driver = fake_replace
+        try:
+            async with pool.acquire() as leased:
+                assert leased is driver
+            return pool, driver, replaced
+        finally:
+            pool.executor.shutdown(wait=True)
+
+    pool, driver, replaced = asyncio.run(scenario())
+    assert replaced == []
+    assert pool.reset_counts[id(driver)] == 1
+    assert pool.usage_counts[id(driver)] == 0
+    assert pool.drivers.qsize() == 1
+
+
+def test_driver_replaced_after_max_resets():
+    async def scenario():
+        driver = FakeDriver()
+        pool = _pool_with(driver, max_uses=1, max_resets=1)
+        pool.reset_counts[id(driver)] = 1
+        replaced = []
+
+        async def fake_replace(d):
+            replaced.append(d)
+
+        pool._replace_driver = fake_replace
+        try:
+            async with pool.acquire():
+                pass
+            return driver, replaced
+        finally:
+            pool.executor.shutdown(wait=True)
+
+    driver, replaced = asyncio.run(scenario())
+    assert replaced == [driver]
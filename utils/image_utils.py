@@ -1,29 +1,32 @@
 from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 import logging
 
+from utils.webdriver_pool import build_chrome_options, get_chromedriver_path
+
 logger = logging.getLogger(__name__)
 chrome_driver = None
 
+STANDALONE_CHROME_FLAGS = (
+    "--headless",
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+    "--window-size=800,800",
+    "--disable-web-security",
+    "--allow-running-insecure-content",
+    "--disable-features=VizDisplayCompositor",
+)
+
 async def init_chrome_driver():
     global chrome_driver
     if chrome_driver is None:
         logger.info("Starting ChromeDriver...")
-        options = Options()
-        options.add_argument("--headless")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--disable-gpu")
-        options.add_argument("--window-size=800,800")
-        options.add_argument("--disable-web-security")
-        options.add_argument("--allow-running-insecure-content")
-        options.add_argument("--disable-features=VizDisplayCompositor")
-        
+        options = build_chrome_options(STANDALONE_CHROME_FLAGS)
+
         try:
             # Try to use webdriver_manager to automatically download ChromeDriver
-            service = Service(ChromeDriverManager().install())
+            service = Service(get_chromedriver_path())
             chrome_driver = webdriver.Chrome(service=service, options=options)
             logger.info("ChromeDriver started successfully with webdriver_manager")
         except Exception as e:
@@ -40,17 +43,9 @@ async def init_chrome_driver():
     return chrome_driver
 
 def get_chrome_driver():
-    options = Options()
-    options.add_argument("--headless")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("--disable-gpu")
-    options.add_argument("--window-size=800,800")
-    options.add_argument("--disable-web-security")
-    options.add_argument("--allow-running-insecure-content")
-    options.add_argument("--disable-features=VizDisplayCompositor")
+    options = build_chrome_options(STANDALONE_CHROME_FLAGS)
     try:
-        service = Service(ChromeDriverManager().install())
+        service = Service(get_chromedriver_path())
         driver = webdriver.Chrome(service=service, options=options)
         logger.info("ChromeDriver started successfully with webdriver_manager")
         return driver
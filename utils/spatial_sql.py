@@ -0,0 +1,30 @@
+from functools import lru_cache
+import shapely
+from typing import Any, Dict, List, Mapping, Tuple
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import text
+from sqlalchemy.sql.elements import TextClause
+
+
+@lru_cache(maxsize=64)
+def _parts_query(parts: Tuple[Tuple[str, str], ...]) -> TextClause:
+    fields = ",\n".join(
+        f"'{name}', (SELECT COALESCE(jsonb_agg(to_jsonb(q)), '[]'::jsonb) FROM ({sql.strip().rstrip(';')}) q)"
+        for name, sql in parts
+    )
+    return text(f"SELECT jsonb_build_object(\n{fields}\n) AS result").columns(result=JSONB)
+
+
+async def fetch_query_parts(session: AsyncSession, parts: Mapping[str, str], params: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Runs several SELECTs as labeled subqueries of one statement (one parse/plan and one round trip).
+    Returns {label: [row dict, ...]} with rows keyed by column name.
+    """
+    result = await session.execute(_parts_query(tuple(parts.items())), params)
+    return result.scalar_one()
+
+
+def to_ewkb(geom: shapely.Geometry, srid: int = 4326) -> bytes:
+    """EWKB for binding as :ewkb; ST_GeomFromEWKB is far cheaper server-side than parsing WKT."""
+    return shapely.to_wkb(shapely.set_srid(geom, srid), include_srid=True)
@@ -1,10 +1,10 @@
 import asyncio
 import logging
 import shutil
-import glob
 import os
-from typing import List
-from fastapi.concurrency import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from typing import List, Optional, Tuple
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
@@ -12,20 +12,60 @@ from webdriver_manager.chrome import ChromeDriverManager
 
 logger = logging.getLogger(__name__)
 
+# Satellite tile host used by every map render; each driver opens a connection to it up front.
+TILE_WARMUP_URL = "https://mt1.google.com/vt/lyrs=s&x=0&y=0&z=1"
+# Origins the rendered map page loads from (tile host and the Leaflet CDN); their site storage
+# is dropped on a session reset. Chromium rejects wildcard origins, so they are listed.
+SESSION_ORIGINS = ("https://mt1.google.com", "https://cdn.jsdelivr.net")
+
+POOL_CHROME_FLAGS = (
+    "--headless=new",
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disk-cache-size=67108864",  # 64MB, so tiles shared by nearby parcels are reused; profile is wiped on recycle
+    "--media-cache-size=1",
+    "--disable-gpu",
+    "--window-size=800,600",
+    "--disable-extensions",
+)
+
+
+def build_chrome_options(flags: Tuple[str, ...], page_load_strategy: Optional[str] = None) -> Options:
+    """Chrome Options from a flag tuple; shared by the pool and the standalone drivers in image_utils."""
+    options = Options()
+    for flag in flags:
+        options.add_argument(flag)
+    if page_load_strategy:
+        options.page_load_strategy = page_load_strategy
+    return options
+
+
+@lru_cache(maxsize=1)
+def get_chromedriver_path() -> str:
+    """Resolves (and downloads if needed) the ChromeDriver binary once per process; failures are retried."""
+    return ChromeDriverManager().install()
+
+
 class WebDriverPool:
     _instance = None
     
-    def __init__(self, pool_size: int = 4, max_uses: int = 50):
+    def __init__(self, pool_size: int = 4, max_uses: int = 50, max_resets: int = 10):
         self.pool_size = pool_size
-        self.max_uses = max_uses 
+        self.max_uses = max_uses  # renders between session resets
+        self.max_resets = max_resets  # session resets before the Chrome process is replaced
         self.drivers: asyncio.Queue = asyncio.Queue(maxsize=pool_size)
         self.usage_counts = {} 
+        self.reset_counts = {}
+        # Dedicated threads for blocking driver calls so renders never queue
+        # behind unrelated work on the loop's default executor.
+        self.executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="webdriver")
 
     @classmethod
     async def initialize(cls, pool_size: int = 4):
         cls._cleanup_stale_temp_files()
 
         if cls._instance is None:
+            await asyncio.to_thread(get_chromedriver_path)
             cls._instance = cls(pool_size)
             await cls._instance._start_drivers()
         return cls._instance
@@ -33,17 +73,22 @@ class WebDriverPool:
     @staticmethod
     def _cleanup_stale_temp_files():
         """Aggressively remove old chromium temp files from /tmp to free space."""
+        def remove(entry: os.DirEntry):
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    shutil.rmtree(entry.path)
+                else:
+                    os.remove(entry.path)
+            except Exception as e:
+                logger.warning(f"Could not delete stale file {entry.path}: {e}")
+
         try:
             logger.info("Cleaning up stale Chromium temp files...")
-            files = glob.glob("/tmp/.org.chromium.Chromium.*")
-            for f in files:
-                try:
-                    if os.path.isdir(f):
-                        shutil.rmtree(f)
-                    else:
-                        os.remove(f)
-                except Exception as e:
-                    logger.warning(f"Could not delete stale file {f}: {e}")
+            with os.scandir("/tmp") as it:
+                entries = [entry for entry in it if entry.name.startswith(".org.chromium.Chromium.")]
+            # Each removal is independent and I/O-bound.
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                list(executor.map(remove, entries))
         except Exception as e:
             logger.error(f"Error during temp file cleanup: {e}")
 
@@ -59,74 +104,123 @@ class WebDriverPool:
             raise RuntimeError("WebDriverPool not initialized.")
         return cls._instance
 
-    def _create_driver_options(self):
-        options = Options()
-        options.add_argument("--headless=new")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage") 
-        options.add_argument("--disk-cache-size=1") # Limit cache to 1 byte (effectively disabled)
-        options.add_argument("--media-cache-size=1")
-        
-        options.add_argument("--disable-gpu")
-        options.add_argument("--window-size=800,600")
-        options.add_argument("--disable-extensions")
-        options.add_argument("--dns-prefetch-disable")
-        options.page_load_strategy = 'eager'
-        return options
+    async def run(self, func, *args, **kwargs):
+        """Run a blocking Selenium call on the pool's driver threads."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(func, *args, **kwargs))
 
     async def _create_new_driver(self):
         """Helper to create a single driver instance."""
-        options = self._create_driver_options()
-        driver_path = ChromeDriverManager().install()
-        service = Service(driver_path)
+        options = build_chrome_options(POOL_CHROME_FLAGS, page_load_strategy="eager")
+        service = Service(await self.run(get_chromedriver_path))
+
+        driver = await self.run(webdriver.Chrome, service=service, options=options)
+        try:
+            await self.run(self._warm_driver, driver)
+        except Exception as e:
+            logger.warning(f"Driver warm-up failed: {e}")
+        return driver
 
-        return await asyncio.to_thread(webdriver.Chrome, service=service, options=options)
+    @staticmethod
+    def _warm_driver(driver):
+        """Enables the HTTP cache and opens the TLS connection to the tile host before the first render."""
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setCacheDisabled", {"cacheDisabled": False})
+        driver.execute_script(f"fetch('{TILE_WARMUP_URL}', {{mode: 'no-cors', credentials: 'include'}}).catch(function () {{}});")
 
     async def _start_drivers(self):
         logger.info(f"Initializing WebDriverPool with {self.pool_size} instances...")
         
-        for i in range(self.pool_size):
-            try:
-                driver = await self._create_new_driver()
-                self.usage_counts[id(driver)] = 0
-                await self.drivers.put(driver)
-            except Exception as e:
-                logger.error(f"Failed to create driver {i}: {e}")
+        # Launch concurrently; each Chrome start blocks one of the pool's executor threads.
+        drivers = await asyncio.gather(
+            *(self._create_new_driver() for _ in range(self.pool_size)), return_exceptions=True
+        )
+        for i, driver in enumerate(drivers):
+            if isinstance(driver, BaseException):
+                logger.error(f"Failed to create driver {i}: {driver}")
+                continue
+            self.usage_counts[id(driver)] = 0
+            await self.drivers.put(driver)
         
         logger.info(f"WebDriverPool ready with {self.drivers.qsize()} drivers.")
 
+    @staticmethod
+    def _reset_session(driver):
+        """Drops cookies and site storage but keeps the process (and its tile cache) running."""
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        for origin in SESSION_ORIGINS:
+            # Site storage only; the HTTP cache holding the tiles is not a storage type.
+            driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+        driver.get("about:blank")
+
+    async def _replace_driver(self, driver):
+        """Quits a driver and puts a freshly started one in its place."""
+        self.usage_counts.pop(id(driver), None)
+        self.reset_counts.pop(id(driver), None)
+        try:
+            await self.run(driver.quit) # Cleanly deletes /tmp folder
+        except Exception:
+            pass
+        try:
+            new_driver = await self._create_new_driver()
+            self.usage_counts[id(new_driver)] = 0
+            await self.drivers.put(new_driver)
+        except Exception as e:
+            logger.error(f"Failed to replace recycled driver: {e}")
+
     async def _close_drivers(self):
         logger.info("Shutting down WebDriverPool...")
         while not self.drivers.empty():
             try:
                 driver = await self.drivers.get()
-                await asyncio.to_thread(driver.quit)
+                await self.run(driver.quit)
             except Exception:
                 pass
-    @asynccontextmanager
-    async def acquire(self):
-        driver = await self.drivers.get()
+        self.executor.shutdown(wait=False)
+    def acquire(self) -> "_DriverLease":
+        """Borrow a driver: ``async with pool.acquire() as driver: ...``"""
+        return _DriverLease(self)
+
+    async def _release(self, driver, used: bool):
         driver_id = id(driver)
-        
-        try:
-            yield driver
+        if used:
             self.usage_counts[driver_id] += 1
-        finally:
-            if self.usage_counts.get(driver_id, 0) >= self.max_uses:
-                logger.info(f"Recycling driver {driver_id} after {self.max_uses} uses.")
-                try:
-                    await asyncio.to_thread(driver.quit) # Cleanly deletes /tmp folder
-                except Exception:
-                    pass
-                try:
-                    new_driver = await self._create_new_driver()
-                    self.usage_counts[id(new_driver)] = 0
-                    await self.drivers.put(new_driver)
-                except Exception as e:
-                    logger.error(f"Failed to replace recycled driver: {e}")
+        if self.usage_counts.get(driver_id, 0) >= self.max_uses:
+            if self.reset_counts.get(driver_id, 0) >= self.max_resets:
+                # Periodic full restart bounds Chrome's memory growth.
+                logger.info(f"Recycling driver {driver_id} after {self.max_resets} session resets.")
+                await self._replace_driver(driver)
             else:
                 try:
-                    await asyncio.to_thread(driver.get, "about:blank")
+                    await self.run(self._reset_session, driver)
+                    self.usage_counts[driver_id] = 0
+                    self.reset_counts[driver_id] = self.reset_counts.get(driver_id, 0) + 1
                     await self.drivers.put(driver)
-                except Exception:
-                    await self._create_new_driver()
\ No newline at end of file
+                except Exception as e:
+                    logger.warning(f"Session reset failed for driver {driver_id}, recycling: {e}")
+                    await self._replace_driver(driver)
+        else:
+            try:
+                await self.run(driver.get, "about:blank")
+                await self.drivers.put(driver)
+            except Exception:
+                await self._replace_driver(driver)
+
+
+class _DriverLease:
+    """Async context manager returned by WebDriverPool.acquire (a plain object, no generator frame per render)."""
+
+    __slots__ = ("pool", "driver")
+
+    def __init__(self, pool: WebDriverPool):
+        self.pool = pool
+        self.driver = None
+
+    async def __aenter__(self):
+        self.driver = await self.pool.drivers.get()
+        return self.driver
+
+    async def __aexit__(self, exc_type, exc, tb):
+        # A render only counts as a use when it completed without raising.
+        await self.pool._release(self.driver, used=exc_type is None)
+        return False